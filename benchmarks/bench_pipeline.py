@@ -0,0 +1,190 @@
+"""Benchmark de chaque étape du pipeline ETL sur des données synthétiques.
+
+Mesure, pour l'extraction, le nettoyage, l'agrégation, les méthodes prepare_* et le
+chargement, le meilleur temps sur plusieurs répétitions puis le pic mémoire
+(tracemalloc, sur une exécution séparée pour ne pas fausser les temps). Les
+résultats sont écrits en JSON pour comparer les exécutions d'une version à l'autre.
+
+L'étape de chargement n'est exécutée que si une base PostgreSQL jetable est fournie
+(--database-url ou BENCH_DATABASE_URL) : ses tables sont supprimées puis recréées.
+Chaque répétition part de tables vidées (hors mesure) et mesure un premier chargement
+complet : sur des tables déjà remplies, les empreintes de contenu écarteraient toutes
+les lignes et seule leur comparaison serait mesurée.
+
+Usage : python benchmarks/bench_pipeline.py --echelle 10 [--database-url postgresql://...]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from benchmarks.synthetic_data import write_sources
+from scripts.run_etl import (ETLPipeline, COVID_CLEANING_CONFIG, COVID_AGGREGATION_CONFIG,
+                             MPOX_CLEANING_CONFIG, MPOX_AGGREGATION_CONFIG)
+from src.config.database import DatabaseManager
+from src.extractors import CovidExtractor, MpoxExtractor
+from src.loaders import PostgresLoader
+from src.models.models import Base
+
+DOSSIER_RESULTATS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def mesurer(fonction, repetitions, preparation=None):
+    """Meilleur temps sur plusieurs répétitions, puis pic mémoire sur une exécution à part"""
+    meilleur = float('inf')
+    resultat = None
+    for _ in range(repetitions):
+        argument = preparation() if preparation else None
+        debut = time.perf_counter()
+        resultat = fonction(argument) if preparation else fonction()
+        meilleur = min(meilleur, time.perf_counter() - debut)
+
+    argument = preparation() if preparation else None
+    tracemalloc.start()
+    try:
+        fonction(argument) if preparation else fonction()
+        _, pic = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return resultat, meilleur, pic
+
+
+def nombre_lignes(resultat):
+    """Nombre de lignes produites par une étape"""
+    if isinstance(resultat, pd.DataFrame):
+        return len(resultat)
+    if isinstance(resultat, dict):
+        return sum(len(valeurs) for valeurs in resultat.values())
+    if isinstance(resultat, list):
+        return len(resultat)
+    return None
+
+
+def base_de_benchmark(url):
+    """DatabaseManager pointant sur une base jetable, dont les tables sont recréées"""
+    db = DatabaseManager()
+    db.connect(url)
+    Base.metadata.drop_all(db.engine)
+    Base.metadata.create_all(db.engine)
+    return db
+
+
+def vider_tables(db):
+    """Vide les tables remplies par le chargement (les maladies, initialisées une fois, sont conservées)"""
+    tables = [table.name for table in Base.metadata.sorted_tables if table.name != 'maladie']
+    with db.engine.begin() as connection:
+        connection.execute(text(f"TRUNCATE {', '.join(tables)} RESTART IDENTITY CASCADE"))
+
+
+def run_benchmark(chemins, repetitions, database_url=None):
+    """Exécute chaque étape et retourne la liste des mesures"""
+    pipeline = ETLPipeline(connect=False)
+    # Premier chargement : aucun pays connu, le loader résout les identifiants
+    pipeline.get_pays_id = lambda nom_pays: None
+    etapes = []
+
+    def etape(nom, fonction, preparation=None, repetitions=repetitions):
+        resultat, secondes, pic = mesurer(fonction, repetitions, preparation)
+        etapes.append({
+            'etape': nom,
+            'secondes': round(secondes, 4),
+            'pic_memoire_mo': round(pic / 2**20, 2),
+            'lignes': nombre_lignes(resultat)
+        })
+        print(f"{nom:<22} {secondes:>9.3f} s {pic / 2**20:>10.1f} Mo")
+        return resultat
+
+    covid = etape('extraction_covid', lambda: CovidExtractor(chemins['covid19']).extract())
+    mpox = etape('extraction_mpox', lambda: MpoxExtractor(chemins['mpox']).extract())
+
+    # Le nettoyage modifie son entrée : chaque répétition part d'une copie, hors mesure
+    covid = etape('nettoyage_covid', lambda df: pipeline.cleaner.transform(df, COVID_CLEANING_CONFIG), covid.copy)
+    mpox = etape('nettoyage_mpox', lambda df: pipeline.cleaner.transform(df, MPOX_CLEANING_CONFIG), mpox.copy)
+    covid = etape('agregation_covid', lambda df: pipeline.aggregator.transform(df, COVID_AGGREGATION_CONFIG), covid.copy)
+    mpox = etape('agregation_mpox', lambda df: pipeline.aggregator.transform(df, MPOX_AGGREGATION_CONFIG), mpox.copy)
+
+    transformed_data = {
+        'pays': etape('prepare_pays_data', lambda: pipeline.prepare_pays_data(covid, mpox)),
+        'epidemie': etape('prepare_epidemie_data', lambda: pipeline.prepare_epidemie_data(covid, mpox)),
+        'statistiques': etape('prepare_stats_data', lambda: pipeline.prepare_stats_data(covid, mpox))
+    }
+
+    if database_url:
+        db = base_de_benchmark(database_url)
+        pipeline.db_manager = db
+        pipeline.initialize_maladies()
+
+        def preparation():
+            # Tables vides et loader neuf (identifiants résolus en cache) : chaque mesure est un premier chargement
+            vider_tables(db)
+            return PostgresLoader(db)
+
+        charge = etape('chargement', lambda loader: loader.load(transformed_data) and transformed_data['statistiques'],
+                       preparation)
+        if not charge:
+            raise RuntimeError("Échec du chargement pendant le benchmark")
+        etapes[-1]['pool_connexions'] = db.stats()
+        db.dispose()
+
+    return etapes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des étapes du pipeline ETL sur données synthétiques")
+    parser.add_argument('--echelle', type=float, default=1, help="Multiplicateur du nombre de pays des fichiers fournis")
+    parser.add_argument('--pays', type=int, help="Nombre de pays (remplace --echelle)")
+    parser.add_argument('--jours', type=int, help="Nombre de jours (par défaut, celui des fichiers fournis)")
+    parser.add_argument('--repetitions', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--database-url', default=os.getenv('BENCH_DATABASE_URL'),
+                        help="Base PostgreSQL jetable pour mesurer le chargement (ses tables sont recréées)")
+    parser.add_argument('--output', help="Fichier JSON des résultats (par défaut dans benchmarks/results)")
+    args = parser.parse_args()
+
+    parametres = {
+        'pays_covid': args.pays or int(187 * args.echelle),
+        'jours_covid': args.jours or 188,
+        'pays_mpox': args.pays or int(118 * args.echelle),
+        'jours_mpox': args.jours or 374,
+        'repetitions': args.repetitions,
+        'seed': args.seed,
+        'chargement': bool(args.database_url)
+    }
+
+    with tempfile.TemporaryDirectory() as dossier:
+        chemins = write_sources(dossier, parametres['pays_covid'], parametres['jours_covid'],
+                                parametres['pays_mpox'], parametres['jours_mpox'], args.seed)
+        etapes = run_benchmark(chemins, args.repetitions, args.database_url)
+
+    resultats = {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'parametres': parametres,
+        'environnement': {
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'processeurs': os.cpu_count()
+        },
+        'etapes': etapes
+    }
+
+    output = args.output or os.path.join(
+        DOSSIER_RESULTATS, f"pipeline_{parametres['pays_covid']}x{parametres['jours_covid']}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(resultats, f, ensure_ascii=False, indent=2)
+    print(f"Résultats écrits dans {output}")
+
+
+if __name__ == "__main__":
+    main()
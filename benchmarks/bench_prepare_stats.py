@@ -0,0 +1,96 @@
+"""Benchmark de ETLPipeline.prepare_stats_data sur les fichiers de data/raw.
+
+Compare l'implémentation groupée à l'ancienne implémentation par pays
+(filtrage du DataFrame complet pour chaque pays + iterrows).
+
+Usage : python benchmarks/bench_prepare_stats.py [--repetitions N]
+"""
+import argparse
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.run_etl import ETLPipeline
+
+
+def prepare_stats_data_iterrows(covid_data, mpox_data):
+    """Ancienne implémentation, conservée comme référence"""
+    stats_data = {}
+
+    for pays in covid_data['Country/Region'].unique():
+        data_pays = covid_data[covid_data['Country/Region'] == pays]
+        data_pays = data_pays.sort_values('Date')
+        data_pays['nouveaux_cas'] = data_pays['Confirmed'].diff().fillna(0)
+        data_pays['nouveaux_deces'] = data_pays['Deaths'].diff().fillna(0)
+        stats_data[f"covid_{pays}"] = [{
+            'date': row['Date'],
+            'cas_total': row['Confirmed'],
+            'deces_total': row['Deaths'],
+            'nouveaux_cas': row['nouveaux_cas'],
+            'nouveaux_deces': row['nouveaux_deces'],
+            'cas_actifs': row['Active'],
+            'cas_gueris': row['Recovered']
+        } for _, row in data_pays.iterrows()]
+
+    for pays in mpox_data['location'].unique():
+        data_pays = mpox_data[mpox_data['location'] == pays]
+        stats_data[f"mpox_{pays}"] = [{
+            'date': row['date'],
+            'cas_total': row['total_cases'],
+            'deces_total': row['total_deaths'],
+            'nouveaux_cas': row['new_cases'],
+            'nouveaux_deces': row['new_deaths'],
+            'cas_actifs': 0,
+            'cas_gueris': 0
+        } for _, row in data_pays.iterrows()]
+
+    return stats_data
+
+
+def colonnes_de_reference(stats_data, colonnes):
+    """Restreint chaque ligne aux colonnes produites par l'implémentation de référence"""
+    return {cle: [{colonne: ligne[colonne] for colonne in colonnes} for ligne in lignes]
+            for cle, lignes in stats_data.items()}
+
+
+def mesurer(fonction, repetitions):
+    """Retourne le meilleur temps d'exécution sur plusieurs répétitions"""
+    meilleur = float('inf')
+    resultat = None
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        resultat = fonction()
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    return meilleur, resultat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de prepare_stats_data")
+    parser.add_argument('--repetitions', type=int, default=3)
+    args = parser.parse_args()
+
+    pipeline = ETLPipeline()
+    covid_data = pipeline.process_covid_data()
+    mpox_data = pipeline.process_mpox_data()
+
+    temps_ancien, attendu = mesurer(
+        lambda: prepare_stats_data_iterrows(covid_data, mpox_data), args.repetitions
+    )
+    temps_nouveau, obtenu = mesurer(
+        lambda: pipeline.prepare_stats_data(covid_data, mpox_data), args.repetitions
+    )
+
+    nb_lignes = sum(len(stats) for stats in obtenu.values())
+    print(f"Lignes préparées        : {nb_lignes} ({len(obtenu)} séries)")
+    print(f"iterrows par pays       : {temps_ancien:.3f} s")
+    print(f"groupby vectorisé       : {temps_nouveau:.3f} s")
+    print(f"Accélération            : x{temps_ancien / temps_nouveau:.1f}")
+    # Moyennes mobiles, valeurs par million et empreintes n'existent pas dans la référence :
+    # seules les colonnes communes sont comparées
+    colonnes = next(ligne for lignes in attendu.values() for ligne in lignes).keys()
+    print(f"Résultats identiques    : {attendu == colonnes_de_reference(obtenu, colonnes)}")
+
+
+if __name__ == "__main__":
+    main()
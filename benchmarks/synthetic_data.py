@@ -0,0 +1,126 @@
+"""Générateur de données synthétiques au format des fichiers COVID et MPOX de data/raw.
+
+Les fichiers fournis couvrent 187 pays x 188 jours (COVID) et 118 pays x 374 jours
+(MPOX) : --echelle 10 ou 100 multiplie le nombre de pays pour simuler des volumes
+plus importants.
+
+Usage : python benchmarks/synthetic_data.py --pays 1870 --jours 188 --dossier /tmp/bench
+"""
+import argparse
+import os
+import string
+
+import numpy as np
+import pandas as pd
+
+REGIONS_OMS = ['Africa', 'Americas', 'Eastern Mediterranean', 'Europe', 'South-East Asia', 'Western Pacific']
+
+
+def noms_pays(nb_pays):
+    """Noms et codes ISO à trois lettres des pays synthétiques"""
+    lettres = np.array(list(string.ascii_uppercase))
+    indices = np.arange(nb_pays)
+    codes = [''.join(code) for code in zip(lettres[indices // 676 % 26], lettres[indices // 26 % 26], lettres[indices % 26])]
+    return [f"Pays {i:06d}" for i in indices], codes
+
+
+def series_cumulees(rng, nb_pays, nb_jours, intensite):
+    """Nouveaux cas quotidiens (Poisson) et leurs cumuls, une ligne par pays"""
+    taux = rng.gamma(shape=1.5, scale=intensite, size=(nb_pays, 1))
+    nouveaux = rng.poisson(taux * np.linspace(0.1, 1.0, nb_jours))
+    return nouveaux, nouveaux.cumsum(axis=1)
+
+
+def generate_covid(nb_pays, nb_jours, seed=0, debut='2020-01-22'):
+    """DataFrame au format covid19_global_cases.csv : une ligne par date et par pays"""
+    rng = np.random.default_rng(seed)
+    pays, _ = noms_pays(nb_pays)
+    nouveaux_cas, confirmes = series_cumulees(rng, nb_pays, nb_jours, 200)
+    nouveaux_deces, deces = series_cumulees(rng, nb_pays, nb_jours, 5)
+    nouveaux_gueris, gueris = series_cumulees(rng, nb_pays, nb_jours, 150)
+    deces = np.minimum(deces, confirmes)
+    gueris = np.minimum(gueris, confirmes - deces)
+
+    # Ordre du fichier d'origine : toutes les lignes d'une date, puis la date suivante
+    dates = pd.date_range(debut, periods=nb_jours, freq='D').strftime('%Y-%m-%d')
+    return pd.DataFrame({
+        'Date': np.repeat(dates, nb_pays),
+        'Country/Region': np.tile(pays, nb_jours),
+        'Confirmed': confirmes.T.ravel(),
+        'Deaths': deces.T.ravel(),
+        'Recovered': gueris.T.ravel(),
+        'Active': (confirmes - deces - gueris).T.ravel(),
+        'New cases': nouveaux_cas.T.ravel(),
+        'New deaths': nouveaux_deces.T.ravel(),
+        'New recovered': nouveaux_gueris.T.ravel(),
+        'WHO Region': np.tile(np.array(REGIONS_OMS)[np.arange(nb_pays) % len(REGIONS_OMS)], nb_jours)
+    })
+
+
+def generate_mpox(nb_pays, nb_jours, seed=0, debut='2022-05-01'):
+    """DataFrame au format mpox_global_cases.csv : une ligne par pays et par date"""
+    rng = np.random.default_rng(seed + 1)
+    pays, codes = noms_pays(nb_pays)
+    nouveaux_cas, total_cas = series_cumulees(rng, nb_pays, nb_jours, 3)
+    nouveaux_deces, total_deces = series_cumulees(rng, nb_pays, nb_jours, 0.05)
+    population = rng.integers(100_000, 100_000_000, size=(nb_pays, 1))
+
+    def lisser(valeurs):
+        return pd.DataFrame(valeurs.T).rolling(7, min_periods=1).mean().to_numpy().T
+
+    def par_million(valeurs):
+        return np.round(valeurs / population * 1_000_000, 3).ravel()
+
+    dates = pd.date_range(debut, periods=nb_jours, freq='D').strftime('%Y-%m-%d')
+    return pd.DataFrame({
+        'location': np.repeat(pays, nb_jours),
+        'iso_code': np.repeat(codes, nb_jours),
+        'date': np.tile(dates, nb_pays),
+        'total_cases': total_cas.ravel().astype(float),
+        'total_deaths': total_deces.ravel().astype(float),
+        'new_cases': nouveaux_cas.ravel().astype(float),
+        'new_deaths': nouveaux_deces.ravel().astype(float),
+        'new_cases_smoothed': np.round(lisser(nouveaux_cas), 2).ravel(),
+        'new_deaths_smoothed': np.round(lisser(nouveaux_deces), 2).ravel(),
+        'new_cases_per_million': par_million(nouveaux_cas),
+        'total_cases_per_million': par_million(total_cas),
+        'new_cases_smoothed_per_million': par_million(lisser(nouveaux_cas)),
+        'new_deaths_per_million': par_million(nouveaux_deces),
+        'total_deaths_per_million': par_million(total_deces),
+        'new_deaths_smoothed_per_million': par_million(lisser(nouveaux_deces))
+    })
+
+
+def write_sources(dossier, nb_pays_covid, nb_jours_covid, nb_pays_mpox, nb_jours_mpox, seed=0):
+    """Écrit les deux CSV synthétiques et retourne leurs chemins"""
+    os.makedirs(dossier, exist_ok=True)
+    chemins = {
+        'covid19': os.path.join(dossier, 'covid19_global_cases.csv'),
+        'mpox': os.path.join(dossier, 'mpox_global_cases.csv')
+    }
+    generate_covid(nb_pays_covid, nb_jours_covid, seed).to_csv(chemins['covid19'], index=False)
+    generate_mpox(nb_pays_mpox, nb_jours_mpox, seed).to_csv(chemins['mpox'], index=False)
+    return chemins
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Génère des CSV COVID et MPOX synthétiques")
+    parser.add_argument('--dossier', required=True, help="Dossier de sortie des deux CSV")
+    parser.add_argument('--echelle', type=float, default=1, help="Multiplicateur du nombre de pays des fichiers fournis")
+    parser.add_argument('--pays', type=int, help="Nombre de pays (remplace --echelle)")
+    parser.add_argument('--jours', type=int, help="Nombre de jours (par défaut, celui des fichiers fournis)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    chemins = write_sources(
+        args.dossier,
+        args.pays or int(187 * args.echelle), args.jours or 188,
+        args.pays or int(118 * args.echelle), args.jours or 374,
+        args.seed
+    )
+    for source, chemin in chemins.items():
+        print(f"{source} : {chemin}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,24 +4,97 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Ensuite vos imports
-from src.config.config import DATA_SOURCES
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from src.config.config import DATA_SOURCES, ETL_CONFIG, LOAD_CONFIG, METRICS_CONFIG
 from src.config.database import db_manager
 from src.extractors import CovidExtractor, MpoxExtractor
-from src.transformers import DataCleaner, DataAggregator, DataNormalizer
-from src.loaders import PostgresLoader
+from src.transformers import DataCleaner, DataAggregator, DataNormalizer, IncrementalFilter
+from src.loaders import PostgresLoader, RollupLoader
+from src.loaders.postgres_loader import COLONNES_QUOTIDIENNES, COLONNES_DETAILLEES
+from src.utils.cache import FrameCache
+from src.utils.hashing import content_hashes
+from src.utils.serialization import serialize_frame, deserialize_frame
+from src.utils.metrics import RunMetrics
 from src.utils.logger import setup_logger
-from src.models.models import Pays 
-from src.models.models import Pays, Maladie 
+from src.models.models import Maladie
 
 logger = setup_logger('etl_main')
 
+# Copy-on-write : sélections et DataFrames dérivés partagent leurs données tant qu'ils ne sont pas modifiés
+pd.set_option('mode.copy_on_write', True)
+
+# Configuration des transformations de chaque source
+COVID_CLEANING_CONFIG = {
+    'country_column': 'Country/Region',
+    'date_column': 'Date',
+    'who_region_column': 'WHO Region',
+    'numeric_columns': ['Confirmed', 'Deaths', 'Recovered', 'Active']
+}
+COVID_AGGREGATION_CONFIG = {
+    'date_column': 'Date',
+    'country_column': 'Country/Region',
+    'who_region_column': 'WHO Region',
+    'metrics': ['Confirmed', 'Deaths', 'Recovered', 'Active'],
+    'aggregate_by_country': True
+}
+MPOX_CLEANING_CONFIG = {
+    'country_column': 'location',
+    'date_column': 'date',
+    'iso_code_column': 'iso_code',
+    'numeric_columns': ['total_cases', 'total_deaths', 'new_cases', 'new_deaths']
+}
+MPOX_AGGREGATION_CONFIG = {
+    'date_column': 'date',
+    'country_column': 'location',
+    'iso_code_column': 'iso_code',
+    'metrics': ['total_cases', 'total_deaths', 'new_cases', 'new_deaths'],
+    'aggregate_by_country': True
+}
+
+# Jours d'historique conservés en mode incrémental et streaming : la fenêtre des moyennes mobiles,
+# plus un jour pour que diff() soit juste sur la plus ancienne ligne de la fenêtre
+HISTORIQUE_JOURS = max(ETL_CONFIG['lookback_days'], ETL_CONFIG['rolling_window'] + 1)
+
+# Extracteur, source, colonnes pays et date de chaque maladie
+SOURCES_MALADIES = {
+    'covid': (CovidExtractor, 'covid19', 'Country/Region', 'Date'),
+    'mpox': (MpoxExtractor, 'mpox', 'location', 'date')
+}
+
+# Colonnes agrégées de chaque source (DataFrame vide pour la source absente d'un bloc)
+COLONNES_SOURCES = {
+    'covid': ['Date', 'Country/Region', 'Confirmed', 'Deaths', 'Recovered', 'Active', 'WHO Region'],
+    'mpox': ['date', 'location', 'total_cases', 'total_deaths', 'new_cases', 'new_deaths', 'iso_code']
+}
+
+def process_source_in_worker(prefixe, watermarks=None):
+    """Extraction et transformation d'une maladie dans un processus dédié (mode parallèle)"""
+    pipeline = ETLPipeline(connect=False)  # Aucun accès à la base dans les processus de transformation
+    data = getattr(pipeline, f"process_{prefixe}_data")(watermarks)
+    # Les métriques du processus sont renvoyées avec les données, pour le rapport de l'exécution
+    return serialize_frame(data), pipeline.metrics.report()['etapes']
+
 class ETLPipeline:
-    def __init__(self):
+    def __init__(self, connect=True, load_workers=None):
         self.db_manager = db_manager
-        self.db_manager.connect() # Connexion à la base de données PostgreSQL avant de commencer le pipeline
-        self.loader = PostgresLoader(self.db_manager)
+        self.metrics = RunMetrics()
+        if connect:
+            self.db_manager.connect() # Connexion à la base de données PostgreSQL (moteur partagé s'il existe déjà)
+            self.metrics.watch_engine(self.db_manager.engine)
+            # Attentes et pic d'utilisation du pool, pour le dimensionner (DB_POOL_SIZE, --load-workers)
+            self.metrics.attach('pool_connexions', self.db_manager.stats)
+        self.loader = PostgresLoader(self.db_manager, workers=load_workers, metrics=self.metrics)
+        self.resolver = self.loader.resolver  # Partagé avec le loader, qui le tient à jour
+        self.rollup_loader = RollupLoader(self.db_manager)
         self.cleaner = DataCleaner()
         self.aggregator = DataAggregator()
+        self.normalizer = DataNormalizer()
+        self.population = self.normalizer.load_population(DATA_SOURCES['population'])
+        self.incremental_filter = IncrementalFilter()
+        self.cache = FrameCache()
         
     def initialize_maladies(self):
         """Initialise les maladies dans la base de données"""
@@ -65,218 +138,453 @@ class ETLPipeline:
         
     def get_pays_id(self, nom_pays):
         """Obtient l'ID d'un pays à partir de son nom"""
-        session = None
         try:
-            session = self.db_manager.get_session()
-            pays = session.query(Pays).filter_by(nom_pays=nom_pays).first()
-            session.close()
-            return pays.id_pays if pays else None
+            return self.resolver.get_pays_id(nom_pays)
         except Exception as e:
             logger.error(f"Erreur lors de la récupération de l'ID du pays: {str(e)}")
             return None
-        finally:
-            if session:
-                session.close()
 
-    def calculate_daily_changes(self, data_pays):
-        """Calcule les changements quotidiens"""
-        data_pays = data_pays.sort_values('Date')
-        data_pays['nouveaux_cas'] = data_pays['Confirmed'].diff().fillna(0) 
-        data_pays['nouveaux_deces'] = data_pays['Deaths'].diff().fillna(0)
-        return data_pays
-    
+    def calculate_daily_changes(self, data, country_column='Country/Region', date_column='Date'):
+        """Calcule les changements quotidiens de chaque pays en une seule passe groupée"""
+        data = data.sort_values([country_column, date_column], kind='stable')
+        groupes = data.groupby(country_column, sort=False, observed=True)
+        data['nouveaux_cas'] = groupes['Confirmed'].diff().fillna(0)
+        data['nouveaux_deces'] = groupes['Deaths'].diff().fillna(0)
+        return data
+
+    def calculate_rolling_averages(self, data, country_column, date_column, metrics):
+        """Calcule les moyennes mobiles des nouveaux cas et décès de chaque pays"""
+        return self.aggregator.calculate_rolling_averages(
+            data, date_column, metrics, ETL_CONFIG['rolling_window'], country_column
+        )
+
+    def normalize_per_million(self, data, country_column, metrics):
+        """Joint la population de chaque pays et calcule les métriques par million d'habitants"""
+        return self.normalizer.transform(data, {
+            'country_column': country_column,
+            'population': self.population,
+            'population_column': 'population',
+            'metrics_to_normalize': metrics
+        })
+
+    def build_stats_records(self, data, prefixe, country_column, colonnes):
+        """Découpe un DataFrame trié par pays en listes d'enregistrements statistiques"""
+        stats = data[list(colonnes)].rename(columns=colonnes)
+        # Empreinte du contenu de chaque ligne : le loader n'écrit que les lignes nouvelles ou modifiées
+        stats['hash_contenu'] = content_hashes(stats, COLONNES_QUOTIDIENNES, COLONNES_DETAILLEES, 'date')
+
+        # Un seul to_dict sur tout le DataFrame, puis découpage aux frontières des pays
+        records = stats.to_dict('records')
+        tailles = data.groupby(country_column, sort=False, observed=True).size()
+
+        stats_data = {}
+        debut = 0
+        for pays, taille in tailles.items():
+            stats_data[f"{prefixe}_{pays}"] = records[debut:debut + taille]
+            debut += taille
+        return stats_data
 
     def prepare_pays_data(self, covid_data, mpox_data):
         """Prépare les données des pays avec les informations des CSV"""
-        pays_data = []
-
-        # Traitement des données COVID
-        for pays in covid_data['Country/Region'].unique():
-            pays_info = {
-                'nom_pays': pays,
-                'code_iso': None,  # COVID n'a pas de code ISO
-                'region_oms': covid_data[covid_data['Country/Region'] == pays]['WHO Region'].iloc[0]
-            }
-            pays_data.append(pays_info)
-
-        # Traitement des données MPOX
-        for pays in mpox_data['location'].unique():
-            # Vérifier si le pays n'est pas déjà traité
-            if not any(p['nom_pays'] == pays for p in pays_data):
-                pays_info = {
-                    'nom_pays': pays,
-                    'code_iso': mpox_data[mpox_data['location'] == pays]['iso_code'].iloc[0],
-                    'region_oms': None  # MPOX n'a pas de région OMS
-                }
-                pays_data.append(pays_info)
+        # Une ligne par pays et par source, en ordre d'apparition
+        covid_pays = (covid_data.groupby('Country/Region', sort=False, observed=True)
+                      .agg(region_oms=('WHO Region', 'first'))
+                      .rename_axis('nom_pays').reset_index())
+        mpox_pays = (mpox_data.groupby('location', sort=False, observed=True)
+                     .agg(code_iso=('iso_code', 'first'))
+                     .rename_axis('nom_pays').reset_index())
+
+        # Fusion des deux sources : les pays COVID d'abord, puis ceux propres à MPOX
+        covid_pays['rang'] = range(len(covid_pays))
+        mpox_pays['rang'] = range(len(covid_pays), len(covid_pays) + len(mpox_pays))
+        pays = covid_pays.merge(mpox_pays, on='nom_pays', how='outer', suffixes=('', '_mpox'), indicator=True)
+        pays = pays.assign(rang=pays['rang'].fillna(pays['rang_mpox'])).sort_values('rang')
 
-        return pays_data
-    
+        # Comme auparavant, le code ISO MPOX n'est retenu que pour les pays absents des données COVID
+        pays['code_iso'] = pays['code_iso'].where(pays['_merge'] == 'right_only')
+
+        # Population issue de la table de référence, jointe en une seule fois
+        pays = self.normalizer.add_population(pays, 'nom_pays', self.population)
+        pays['population'] = pays['population'].astype('Int64')
+
+        pays = pays[['nom_pays', 'code_iso', 'region_oms', 'population']].astype(object)
+        return pays.where(pays.notna(), None).to_dict('records')
 
     def prepare_epidemie_data(self, covid_data, mpox_data):
         """Prépare les données des épidémies"""
         epidemie_data = []
-        
-        # Pour COVID-19
-        for pays in covid_data['Country/Region'].unique():
-            data_pays = covid_data[covid_data['Country/Region'] == pays]
-            pays_id = self.get_pays_id(pays)
-            if pays_id:
+
+        # Date du premier cas de chaque pays, en une seule agrégation par source
+        sources = [
+            (1, covid_data.groupby('Country/Region', sort=False, observed=True)['Date'].min()),
+            (2, mpox_data.groupby('location', sort=False, observed=True)['date'].min())
+        ]
+
+        # id_pays à None pour un pays pas encore chargé : le loader le résout
+        for id_maladie, premiers_cas in sources:
+            for pays, date_premier_cas in premiers_cas.items():
                 epidemie_data.append({
-                    'id_pays': pays_id,
+                    'id_pays': self.get_pays_id(pays),
                     'nom_pays': pays,  # Ajout du nom du pays
-                    'id_maladie': 1,
-                    'date_premier_cas': data_pays['Date'].min(),
-                    'date_fin': None,
-                    'statut': 'En cours'
-                })
-        
-        # Pour MPOX
-        for pays in mpox_data['location'].unique():
-            data_pays = mpox_data[mpox_data['location'] == pays]
-            pays_id = self.get_pays_id(pays)
-            if pays_id:
-                epidemie_data.append({
-                    'id_pays': pays_id,
-                    'nom_pays': pays,  # Ajout du nom du pays 
-                    'id_maladie': 2,
-                    'date_premier_cas': data_pays['date'].min(),
+                    'id_maladie': id_maladie,
+                    'date_premier_cas': date_premier_cas,
                     'date_fin': None,
                     'statut': 'En cours'
                 })
-    
+
         return epidemie_data
 
     def prepare_stats_data(self, covid_data, mpox_data):
         """Prépare les données statistiques"""
         stats_data = {}
-        
-        # Pour COVID-19
-        for pays in covid_data['Country/Region'].unique():
-            data_pays = covid_data[covid_data['Country/Region'] == pays]
-            # Calcul des changements quotidiens
-            data_pays = self.calculate_daily_changes(data_pays)
-            
-            stats_data[f"covid_{pays}"] = [{
-                'date': row['Date'],
-                'cas_total': row['Confirmed'],
-                'deces_total': row['Deaths'],
-                'nouveaux_cas': row['nouveaux_cas'],
-                'nouveaux_deces': row['nouveaux_deces'],
-                'cas_actifs': row['Active'],
-                'cas_gueris': row['Recovered']
-            } for _, row in data_pays.iterrows()]
-        
-        # Pour MPOX
-        for pays in mpox_data['location'].unique():
-            data_pays = mpox_data[mpox_data['location'] == pays]
-            stats_data[f"mpox_{pays}"] = [{
-                'date': row['date'],
-                'cas_total': row['total_cases'],
-                'deces_total': row['total_deaths'],
-                'nouveaux_cas': row['new_cases'],
-                'nouveaux_deces': row['new_deaths'],
-                'cas_actifs': 0,  # Non disponible pour MPOX
-                'cas_gueris': 0   # Non disponible pour MPOX
-            } for _, row in data_pays.iterrows()]
-        
+
+        # Pour COVID-19 : changements quotidiens calculés sur l'ensemble du DataFrame
+        covid_data = self.calculate_daily_changes(covid_data, 'Country/Region', 'Date')
+        covid_data = self.calculate_rolling_averages(covid_data, 'Country/Region', 'Date', ['nouveaux_cas', 'nouveaux_deces'])
+        covid_data = self.normalize_per_million(covid_data, 'Country/Region', ['Confirmed', 'Deaths'])
+        stats_data.update(self.build_stats_records(covid_data, 'covid', 'Country/Region', {
+            'Date': 'date',
+            'Confirmed': 'cas_total',
+            'Deaths': 'deces_total',
+            'nouveaux_cas': 'nouveaux_cas',
+            'nouveaux_deces': 'nouveaux_deces',
+            'Active': 'cas_actifs',
+            'Recovered': 'cas_gueris',
+            'Confirmed_per_million': 'cas_par_million',
+            'Deaths_per_million': 'deces_par_million',
+            'nouveaux_cas_rolling_avg': 'moyenne_mobile_cas',
+            'nouveaux_deces_rolling_avg': 'moyenne_mobile_deces'
+        }))
+
+        # Pour MPOX (moyennes mobiles calculées sur le DataFrame trié par pays et date)
+        mpox_data = self.calculate_rolling_averages(mpox_data, 'location', 'date', ['new_cases', 'new_deaths'])
+        mpox_data = self.normalize_per_million(mpox_data, 'location', ['total_cases', 'total_deaths'])
+        mpox_data = mpox_data.assign(cas_actifs=0, cas_gueris=0)  # Non disponibles pour MPOX
+        stats_data.update(self.build_stats_records(mpox_data, 'mpox', 'location', {
+            'date': 'date',
+            'total_cases': 'cas_total',
+            'total_deaths': 'deces_total',
+            'new_cases': 'nouveaux_cas',
+            'new_deaths': 'nouveaux_deces',
+            'cas_actifs': 'cas_actifs',
+            'cas_gueris': 'cas_gueris',
+            'total_cases_per_million': 'cas_par_million',
+            'total_deaths_per_million': 'deces_par_million',
+            'new_cases_rolling_avg': 'moyenne_mobile_cas',
+            'new_deaths_rolling_avg': 'moyenne_mobile_deces'
+        }))
+
         return stats_data
 
-    def process_covid_data(self):
-        """Traitement des données COVID"""
+    def transform_covid_data(self, covid_data):
+        """Transformation des données COVID"""
+        with self.metrics.stage('nettoyage_covid', len(covid_data)) as mesure:
+            cleaned_data = self.cleaner.transform(covid_data, COVID_CLEANING_CONFIG)
+            mesure.lignes_sortie = len(cleaned_data)
+        with self.metrics.stage('agregation_covid', len(cleaned_data)) as mesure:
+            aggregated_data = self.aggregator.transform(cleaned_data, COVID_AGGREGATION_CONFIG)
+            mesure.lignes_sortie = len(aggregated_data)
+        return aggregated_data
+
+    def transform_mpox_data(self, mpox_data):
+        """Transformation des données MPOX"""
+        with self.metrics.stage('nettoyage_mpox', len(mpox_data)) as mesure:
+            cleaned_data = self.cleaner.transform(mpox_data, MPOX_CLEANING_CONFIG)
+            mesure.lignes_sortie = len(cleaned_data)
+        with self.metrics.stage('agregation_mpox', len(cleaned_data)) as mesure:
+            aggregated_data = self.aggregator.transform(cleaned_data, MPOX_AGGREGATION_CONFIG)
+            mesure.lignes_sortie = len(aggregated_data)
+        return aggregated_data
+
+    def extract_source(self, extractor, prefixe):
+        """Extraction mesurée d'une source"""
+        with self.metrics.stage(f'extraction_{prefixe}') as mesure:
+            data = extractor.extract()
+            mesure.lignes_sortie = len(data)
+        return data
+
+    def filter_incremental(self, data, prefixe, watermarks):
+        """Filtre les données agrégées sur les dates postérieures aux dernières dates chargées"""
+        if watermarks is None:
+            return data
+        _, _, country_column, date_column = SOURCES_MALADIES[prefixe]
+        return self.incremental_filter.transform(data, {
+            'country_column': country_column,
+            'date_column': date_column,
+            'watermarks': watermarks,
+            'lookback_days': HISTORIQUE_JOURS
+        })
+
+    def cache_config(self, extractor, cleaning_config, aggregation_config):
+        """Configuration couverte par la clé du cache d'une source"""
+        return {
+            'lecture': extractor.read_options(),
+            'types': extractor.numeric_dtypes(),
+            'quarantaine': extractor.quarantine,
+            'nettoyage': cleaning_config,
+            'agregation': aggregation_config
+        }
+
+    def process_covid_data(self, watermarks=None):
+        """Traitement des données COVID (watermarks : dernières dates chargées en mode incrémental)"""
         try:
-            # Extraction
             extractor = CovidExtractor(DATA_SOURCES['covid19'])
-            covid_data = extractor.extract()
-            logger.info("Données COVID extraites avec succès")
-
-            # Transformation
-            cleaned_data = self.cleaner.transform(covid_data, {
-                'country_column': 'Country/Region',
-                'date_column': 'Date',
-                'who_region_column': 'WHO Region',
-                'numeric_columns': ['Confirmed', 'Deaths', 'Recovered', 'Active']
-            })
-
-            aggregated_data = self.aggregator.transform(cleaned_data, {
-                'date_column': 'Date',
-                'country_column': 'Country/Region',
-                'who_region_column': 'WHO Region',
-                'metrics': ['Confirmed', 'Deaths', 'Recovered', 'Active'],
-                'aggregate_by_country': True
-            })
-
-            return aggregated_data
+            cle = self.cache.build_key(extractor.file_path, self.cache_config(
+                extractor, COVID_CLEANING_CONFIG, COVID_AGGREGATION_CONFIG
+            ))
+
+            aggregated_data = self.cache.get('covid19', cle)
+            if aggregated_data is None:
+                # Extraction
+                covid_data = self.extract_source(extractor, 'covid')
+                logger.info("Données COVID extraites avec succès")
+
+                # Transformation
+                aggregated_data = self.transform_covid_data(covid_data)
+                self.cache.put('covid19', cle, aggregated_data)
+
+            return self.filter_incremental(aggregated_data, 'covid', watermarks)
 
         except Exception as e:
             logger.error(f"Erreur dans le traitement COVID: {str(e)}")
             raise
 
-    def process_mpox_data(self):
-        """Traitement des données MPOX"""
+    def process_mpox_data(self, watermarks=None):
+        """Traitement des données MPOX (watermarks : dernières dates chargées en mode incrémental)"""
         try:
-            # Extraction
             extractor = MpoxExtractor(DATA_SOURCES['mpox'])
-            mpox_data = extractor.extract()
-            logger.info("Données MPOX extraites avec succès")
-
-            # Transformation similaire au COVID
-            cleaned_data = self.cleaner.transform(mpox_data, {
-                'country_column': 'location',
-                'date_column': 'date',
-                'iso_code_column': 'iso_code',
-                'numeric_columns': ['total_cases', 'total_deaths', 'new_cases', 'new_deaths']
-            })
-
-            aggregated_data = self.aggregator.transform(cleaned_data, {
-                'date_column': 'date',
-                'country_column': 'location',
-                'iso_code_column': 'iso_code',
-                'metrics': ['total_cases', 'total_deaths', 'new_cases', 'new_deaths'],
-                'aggregate_by_country': True
-            })
-
-            return aggregated_data
+            cle = self.cache.build_key(extractor.file_path, self.cache_config(
+                extractor, MPOX_CLEANING_CONFIG, MPOX_AGGREGATION_CONFIG
+            ))
+
+            aggregated_data = self.cache.get('mpox', cle)
+            if aggregated_data is None:
+                # Extraction
+                mpox_data = self.extract_source(extractor, 'mpox')
+                logger.info("Données MPOX extraites avec succès")
+
+                # Transformation similaire au COVID
+                aggregated_data = self.transform_mpox_data(mpox_data)
+                self.cache.put('mpox', cle, aggregated_data)
+
+            return self.filter_incremental(aggregated_data, 'mpox', watermarks)
 
         except Exception as e:
             logger.error(f"Erreur dans le traitement MPOX: {str(e)}")
             raise
 
+    def process_in_parallel(self, watermarks=None):
+        """Extraction et transformation des deux maladies en parallèle, un processus par maladie"""
+        prefixes = ['covid', 'mpox']
+        # 'spawn' : les processus ne héritent ni des connexions du pool ni des verrous de logging
+        with ProcessPoolExecutor(max_workers=len(prefixes), mp_context=multiprocessing.get_context('spawn')) as executor:
+            futures = {
+                prefixe: executor.submit(
+                    process_source_in_worker,
+                    prefixe,
+                    watermarks.get(prefixe) if watermarks is not None else None
+                )
+                for prefixe in prefixes
+            }
+            resultats = []
+            for prefixe in prefixes:
+                data, etapes = futures[prefixe].result()
+                self.metrics.merge(etapes)
+                resultats.append(deserialize_frame(data))
+            return tuple(resultats)
+
     def prepare_for_loading(self, covid_data, mpox_data):
         """Prépare les données pour le chargement"""
-        return {
-            'pays': self.prepare_pays_data(covid_data, mpox_data),
-            'epidemie': self.prepare_epidemie_data(covid_data, mpox_data),
-            'statistiques': self.prepare_stats_data(covid_data, mpox_data)
-        }
+        transformed_data = {}
+        nb_lignes = len(covid_data) + len(mpox_data)
+        for cle, methode in (('pays', self.prepare_pays_data),
+                             ('epidemie', self.prepare_epidemie_data),
+                             ('statistiques', self.prepare_stats_data)):
+            with self.metrics.stage(methode.__name__, nb_lignes) as mesure:
+                transformed_data[cle] = methode(covid_data, mpox_data)
+                resultat = transformed_data[cle]
+                mesure.lignes_sortie = sum(map(len, resultat.values())) if isinstance(resultat, dict) else len(resultat)
+        return transformed_data
+
+    def refresh_rollups(self):
+        """Recalcule les agrégats des périodes touchées par l'exécution"""
+        if not ETL_CONFIG['rollups']:
+            return
+        plages = self.loader.plages_modifiees
+        # Journal lu avant le recalcul : une partition validée entre-temps reste à recalculer
+        journal = self.loader.pending_rollups(plages)
+        # Lignes d'entrée : épidémies dont une plage de dates a été écrite
+        with self.metrics.stage('rollups', len(plages)):
+            self.rollup_loader.load(plages)
+        self.loader.mark_rollups_refreshed(journal)
 
-    def run(self):
-        """Exécution du pipeline ETL complet"""
+    def complete_run(self):
+        """Clôt l'exécution chargée : succès, ou partielle si des lignes ont été rejetées"""
+        if self.loader.lignes_rejetees:
+            run_id = self.loader.run_id
+            self.loader.finish_run('partiel')
+            logger.error(f"Pipeline ETL terminé avec {self.loader.lignes_rejetees} lignes statistiques rejetées : "
+                         f"exécution {run_id} partielle, reprise possible avec --resume après correction")
+            return False
+        self.loader.finish_run('succes')
+        logger.info("Pipeline ETL terminé avec succès")
+        return True
+
+    def write_metrics(self):
+        """Écrit le rapport de métriques de l'exécution (JSON, et Prometheus si configuré)"""
+        try:
+            self.metrics.log_summary()
+            self.metrics.write_json(os.path.join(
+                METRICS_CONFIG['report_dir'], f"etl_metrics_{self.metrics.debut:%Y%m%d_%H%M%S}_{self.metrics.run_id}.json"
+            ))
+            if METRICS_CONFIG['prometheus_file']:
+                self.metrics.write_prometheus(METRICS_CONFIG['prometheus_file'])
+        except OSError as e:
+            # Les métriques ne doivent jamais faire échouer l'exécution
+            logger.warning(f"Impossible d'écrire le rapport de métriques : {str(e)}")
+
+    def trim_to_watermarks(self, stats_data, watermarks):
+        """Retire les lignes d'historique déjà chargées, conservées pour les calculs"""
+        trimmed_data = {}
+        for key, stats_list in stats_data.items():
+            prefixe, pays = key.split('_', 1)
+            watermark = watermarks.get(prefixe, {}).get(pays)
+            if watermark is not None:
+                stats_list = [stat for stat in stats_list if stat['date'] > watermark]
+            if stats_list:
+                trimmed_data[key] = stats_list
+        return trimmed_data
+
+    def stream_source(self, prefixe, chunksize, watermarks=None):
+        """Traite et charge une source bloc par bloc, à mémoire bornée par la taille des blocs"""
+        extractor_class, source, country_column, date_column = SOURCES_MALADIES[prefixe]
+        transform = getattr(self, f"transform_{prefixe}_data")
+        aggregation_config = COVID_AGGREGATION_CONFIG if prefixe == 'covid' else MPOX_AGGREGATION_CONFIG
+        vide = pd.DataFrame(columns=COLONNES_SOURCES['mpox' if prefixe == 'covid' else 'covid'])
+
+        historique = None
+        nb_blocs = 0
+        chunks = extractor_class(DATA_SOURCES[source]).extract_chunks(chunksize)
+        while True:
+            # Lecture du bloc suivant mesurée comme une extraction
+            with self.metrics.stage(f'extraction_{prefixe}') as mesure:
+                chunk = next(chunks, None)
+                mesure.lignes_sortie = len(chunk) if chunk is not None else 0
+            if chunk is None:
+                break
+
+            data = self.filter_incremental(transform(chunk), prefixe, watermarks)
+            seuils = dict(watermarks or {})
+
+            if historique is not None:
+                # Les dernières lignes du bloc précédent assurent la continuité de diff() ; la
+                # ré-agrégation fusionne un groupe (date, pays) coupé entre deux blocs
+                data = self.aggregator.transform(pd.concat([historique, data], ignore_index=True), aggregation_config)
+
+                # La dernière date déjà émise est ré-émise : l'upsert la corrige si son groupe était coupé
+                for pays, date_max in historique.groupby(country_column, sort=False, observed=True)[date_column].max().items():
+                    seuil = date_max - pd.Timedelta(days=1)
+                    seuils[pays] = max(seuils[pays], seuil) if pays in seuils else seuil
+
+            historique = (data.sort_values([country_column, date_column], kind='stable')
+                          .groupby(country_column, sort=False, observed=True).tail(HISTORIQUE_JOURS))
+
+            frames = (data, vide) if prefixe == 'covid' else (vide, data)
+            transformed_data = self.prepare_for_loading(*frames)
+            transformed_data['statistiques'] = self.trim_to_watermarks(transformed_data['statistiques'], {prefixe: seuils})
+            if not self.loader.load(transformed_data):
+                raise RuntimeError(f"Échec du chargement du bloc {nb_blocs} ({prefixe.upper()})")
+            nb_blocs += 1
+
+        logger.info(f"Traitement {prefixe.upper()} par blocs terminé : {nb_blocs} blocs")
+
+    def run(self, incremental=None, chunksize=None, parallel=None, resume=False):
+        """Exécution du pipeline ETL complet (resume : reprend la dernière exécution inachevée)"""
+        if incremental is None:
+            incremental = ETL_CONFIG['incremental']
+        if chunksize is None:
+            chunksize = ETL_CONFIG['chunksize']
+        if parallel is None:
+            parallel = ETL_CONFIG['parallel']
+        self.metrics.reset()
+        run_id = None
         try:
-            logger.info("Démarrage du pipeline ETL")
+            logger.info(f"Démarrage du pipeline ETL{' (mode incrémental)' if incremental else ''}")
             
             # Initialisation des données de référence
             self.initialize_maladies()
 
-            # Process COVID data
-            covid_data = self.process_covid_data()
-            logger.info("Traitement COVID terminé")
+            # Exécution journalisée : chaque partition validée y est enregistrée
+            run_id = self.loader.start_run(resume)
+            self.metrics.run_id = run_id
+
+            # Dernières dates déjà chargées, par maladie et par pays
+            watermarks = self.loader.get_watermarks() if incremental else {}
 
-            # Process MPOX data
-            mpox_data = self.process_mpox_data()
-            logger.info("Traitement MPOX terminé")
+            if chunksize:
+                # Mode streaming : extraction, transformation et chargement bloc par bloc
+                if parallel:
+                    logger.warning("Le mode parallèle ne s'applique pas au mode streaming : traitement séquentiel")
+                self.stream_source('covid', chunksize, watermarks.get('covid') if incremental else None)
+                self.stream_source('mpox', chunksize, watermarks.get('mpox') if incremental else None)
+                self.refresh_rollups()
+                return self.complete_run()
+
+            if parallel:
+                # Process COVID and MPOX data in separate processes
+                covid_data, mpox_data = self.process_in_parallel(watermarks if incremental else None)
+                logger.info("Traitements COVID et MPOX terminés (mode parallèle)")
+            else:
+                # Process COVID data
+                covid_data = self.process_covid_data(watermarks.get('covid') if incremental else None)
+                logger.info("Traitement COVID terminé")
+
+                # Process MPOX data
+                mpox_data = self.process_mpox_data(watermarks.get('mpox') if incremental else None)
+                logger.info("Traitement MPOX terminé")
 
             # Prepare and load data
             transformed_data = self.prepare_for_loading(covid_data, mpox_data)
-            self.loader.load(transformed_data)
+            if incremental:
+                transformed_data['statistiques'] = self.trim_to_watermarks(transformed_data['statistiques'], watermarks)
+                nb_lignes = sum(len(stats_list) for stats_list in transformed_data['statistiques'].values())
+                logger.info(f"Mode incrémental : {nb_lignes} nouvelles lignes statistiques à charger")
+            if not self.loader.load(transformed_data):
+                raise RuntimeError("Échec du chargement des données")
 
-            logger.info("Pipeline ETL terminé avec succès")
-            return True
+            self.refresh_rollups()
+            return self.complete_run()
 
         except Exception as e:
             logger.error(f"Erreur dans le pipeline ETL: {str(e)}")
+            if run_id:
+                try:
+                    # Les lots validés avant l'échec sont ignorés comme inchangés par les exécutions suivantes :
+                    # leurs agrégats sont recalculés maintenant
+                    self.refresh_rollups()
+                except Exception as erreur_agregats:
+                    logger.error(f"Agrégats non recalculés après l'échec: {str(erreur_agregats)}")
+                self.loader.finish_run('echec')
+                logger.info(f"Reprise possible avec --resume (exécution {run_id})")
             return False
+        finally:
+            self.write_metrics()
 
 if __name__ == "__main__":
-    pipeline = ETLPipeline()
-    pipeline.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Pipeline ETL des données OMS")
+    parser.add_argument('--incremental', action='store_true', default=ETL_CONFIG['incremental'],
+                        help="Ne traite que les dates postérieures à la dernière date chargée")
+    parser.add_argument('--chunksize', type=int, default=ETL_CONFIG['chunksize'],
+                        help="Traite les fichiers par blocs de N lignes (0 = fichier entier)")
+    parser.add_argument('--parallel', action='store_true', default=ETL_CONFIG['parallel'],
+                        help="Traite COVID et MPOX en parallèle, chacun dans un processus")
+    parser.add_argument('--load-workers', type=int, default=LOAD_CONFIG['workers'],
+                        help="Nombre de partitions de statistiques chargées en parallèle")
+    parser.add_argument('--resume', action='store_true',
+                        help="Reprend la dernière exécution inachevée sans recharger ses partitions validées")
+    args = parser.parse_args()
+
+    pipeline = ETLPipeline(load_workers=args.load_workers)
+    succes = pipeline.run(incremental=args.incremental, chunksize=args.chunksize,
+                          parallel=args.parallel, resume=args.resume)
+    sys.exit(0 if succes else 1)
\ No newline at end of file
@@ -0,0 +1,183 @@
+# Ajout du répertoire parent au chemin de recherche de Python (comme run_etl.py)
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+from datetime import date
+import pandas as pd
+from sqlalchemy import UniqueConstraint, inspect, text
+from sqlalchemy.schema import AddConstraint, CreateColumn, CreateTable
+from src.config.database import db_manager
+from src.models.models import Base, StatistiquesQuotidiennes, StatistiquesDetaillees
+from src.utils.logger import setup_logger
+
+logger = setup_logger('setup_db')
+
+TABLE_PARTITIONNEE = StatistiquesQuotidiennes.__table__
+COLONNE_PARTITION = 'date_observation'
+
+# Granularité des partitions : (fréquence pandas, format du suffixe)
+GRANULARITES = {
+    'mois': ('MS', '%Y_%m'),
+    'annee': ('YS', '%Y')
+}
+
+
+def partition_bounds(granularite, debut, fin):
+    """Bornes [début, fin[ de chaque partition couvrant la période demandée"""
+    frequence, _ = GRANULARITES[granularite]
+    # Premier jour de la période contenant debut, jusqu'à la période suivant fin
+    bornes = pd.date_range(pd.Timestamp(debut).to_period(frequence[0]).start_time,
+                           pd.Timestamp(fin).to_period(frequence[0]).end_time + pd.Timedelta(days=1),
+                           freq=frequence)
+    return [(borne_debut.date(), borne_fin.date()) for borne_debut, borne_fin in zip(bornes[:-1], bornes[1:])]
+
+
+def is_partitioned(connection, table_name):
+    """Indique si la table existe déjà comme table partitionnée"""
+    return connection.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table p "
+        "JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = :table AND pg_table_is_visible(c.oid))"
+    ), {'table': table_name}).scalar()
+
+
+def create_partitioned_statistiques(connection):
+    """Crée statistiques_quotidiennes partitionnée par plage de dates"""
+    # Les contraintes d'unicité d'une table partitionnée doivent inclure la clé de partition :
+    # la clé primaire devient (id_stat, date_observation)
+    colonnes = [str(CreateColumn(colonne).compile(dialect=connection.dialect)) for colonne in TABLE_PARTITIONNEE.columns]
+    contraintes = [f"PRIMARY KEY (id_stat, {COLONNE_PARTITION})"]
+    for contrainte in TABLE_PARTITIONNEE.constraints:
+        if contrainte is TABLE_PARTITIONNEE.primary_key:
+            continue
+        contraintes.append(str(AddConstraint(contrainte).compile(dialect=connection.dialect)).split(' ADD ', 1)[1])
+
+    connection.execute(text(
+        f"CREATE TABLE {TABLE_PARTITIONNEE.name} (\n    "
+        + ",\n    ".join(colonnes + contraintes)
+        + f"\n) PARTITION BY RANGE ({COLONNE_PARTITION})"
+    ))
+    # Les lignes hors des partitions créées ne sont pas rejetées
+    connection.execute(text(f"CREATE TABLE {TABLE_PARTITIONNEE.name}_defaut PARTITION OF {TABLE_PARTITIONNEE.name} DEFAULT"))
+    logger.info(f"Table {TABLE_PARTITIONNEE.name} créée, partitionnée par {COLONNE_PARTITION}")
+
+
+def create_partitions(connection, granularite, debut, fin):
+    """Crée les partitions manquantes de la période (idempotent)"""
+    _, suffixe = GRANULARITES[granularite]
+    crees = 0
+    for borne_debut, borne_fin in partition_bounds(granularite, debut, fin):
+        nom = f"{TABLE_PARTITIONNEE.name}_{borne_debut.strftime(suffixe)}"
+        if inspect(connection).has_table(nom):
+            continue
+        # Échoue si la partition par défaut contient déjà des lignes de cette période
+        connection.execute(text(
+            f"CREATE TABLE {nom} PARTITION OF {TABLE_PARTITIONNEE.name} "
+            f"FOR VALUES FROM ('{borne_debut.isoformat()}') TO ('{borne_fin.isoformat()}')"
+        ))
+        crees += 1
+    logger.info(f"{crees} partition(s) créée(s) pour la période {debut} - {fin}")
+
+
+def create_tables(connection, partition=None):
+    """Crée les tables manquantes du modèle, avec statistiques_quotidiennes éventuellement partitionnée"""
+    inspecteur = inspect(connection)
+    if not partition:
+        Base.metadata.create_all(connection)
+        return
+
+    existe = inspecteur.has_table(TABLE_PARTITIONNEE.name)
+    if existe and not is_partitioned(connection, TABLE_PARTITIONNEE.name):
+        # Convertir une table existante suppose de recopier ses données : hors du périmètre de ce script
+        raise RuntimeError(f"La table {TABLE_PARTITIONNEE.name} existe déjà sans partitionnement")
+
+    table_detaillee = StatistiquesDetaillees.__table__
+    autres_tables = [table for table in Base.metadata.sorted_tables
+                     if table is not TABLE_PARTITIONNEE and table is not table_detaillee]
+    # Aucune autre table ne référence statistiques_quotidiennes : elles sont créées en premier
+    Base.metadata.create_all(connection, tables=autres_tables)
+    if not existe:
+        create_partitioned_statistiques(connection)
+
+    if not inspecteur.has_table(table_detaillee.name):
+        # Une clé étrangère vers une table partitionnée doit inclure la clé de partition :
+        # id_stat seul ne peut plus être référencé, l'intégrité reste assurée par le loader
+        connection.execute(CreateTable(table_detaillee, include_foreign_key_constraints=[]))
+
+
+def add_missing_columns(connection):
+    """Ajoute aux tables existantes les colonnes apparues dans le modèle (population, hash_contenu...)"""
+    inspecteur = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        if not inspecteur.has_table(table.name):
+            continue
+        existantes = {colonne['name'] for colonne in inspecteur.get_columns(table.name)}
+        for colonne in table.columns:
+            if colonne.name in existantes:
+                continue
+            # Colonne ajoutée sans NOT NULL : les lignes existantes n'ont pas de valeur
+            definition = str(CreateColumn(colonne).compile(dialect=connection.dialect)).replace(' NOT NULL', '')
+            connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN IF NOT EXISTS {definition}"))
+            logger.info(f"Colonne {table.name}.{colonne.name} ajoutée")
+
+
+def add_missing_constraints(connection):
+    """Ajoute les contraintes d'unicité nommées absentes d'une base créée avec une version antérieure"""
+    inspecteur = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        if not inspecteur.has_table(table.name):
+            continue
+        existantes = {contrainte['name'] for contrainte in inspecteur.get_unique_constraints(table.name)}
+        for contrainte in table.constraints:
+            if not isinstance(contrainte, UniqueConstraint) or not contrainte.name or contrainte.name in existantes:
+                continue
+            # Échoue si la table contient des doublons : ils doivent être supprimés avant
+            connection.execute(AddConstraint(contrainte))
+            logger.info(f"Contrainte {contrainte.name} ajoutée sur {table.name}")
+
+
+def create_indexes(connection):
+    """Crée les index du modèle absents (sur une table partitionnée, ils sont propagés à chaque partition)"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
+def setup_database(partition=None, debut=None, fin=None):
+    """Crée ou met à jour le schéma de la base"""
+    if db_manager.engine is None:
+        db_manager.connect()
+
+    with db_manager.engine.begin() as connection:
+        create_tables(connection, partition)
+        add_missing_columns(connection)
+        add_missing_constraints(connection)
+        create_indexes(connection)
+        if is_partitioned(connection, TABLE_PARTITIONNEE.name):
+            if partition:
+                create_partitions(connection, partition, debut, fin)
+        elif partition:
+            logger.warning(f"{TABLE_PARTITIONNEE.name} n'est pas partitionnée : aucune partition créée")
+    logger.info("Schéma de la base à jour")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Création et mise à jour du schéma de la base")
+    parser.add_argument('--partition', choices=sorted(GRANULARITES),
+                        help="Partitionne statistiques_quotidiennes par mois ou par année (à la création de la table)")
+    parser.add_argument('--debut', type=date.fromisoformat, default=date(2020, 1, 1),
+                        help="Première date couverte par les partitions (AAAA-MM-JJ)")
+    parser.add_argument('--fin', type=date.fromisoformat, default=date(date.today().year, 12, 31),
+                        help="Dernière date couverte par les partitions (AAAA-MM-JJ)")
+    args = parser.parse_args()
+
+    try:
+        setup_database(args.partition, args.debut, args.fin)
+    except Exception as e:
+        logger.error(f"Erreur lors de la mise en place du schéma: {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
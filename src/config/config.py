@@ -10,7 +10,17 @@ DB_CONFIG = {
     'port': int(os.getenv('DB_PORT', 5432)),
     'database': os.getenv('DB_NAME', 'oms_pandemic'),
     'user': os.getenv('DB_USER'),
-    'password': os.getenv('DB_PASSWORD')
+    'password': os.getenv('DB_PASSWORD'),
+    # Pool de connexions : à dimensionner d'après DatabaseManager.stats() (attentes, pic d'utilisation)
+    'pool_size': int(os.getenv('DB_POOL_SIZE', 20)),
+    'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 0)),
+    'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', 30)),
+    'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+    'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'false').lower() in ('1', 'true', 'yes'),
+    # psycopg2 : 'values_only' (INSERT multi-lignes) ou 'values_plus_batch' (execute_batch pour UPDATE/DELETE)
+    'executemany_mode': os.getenv('DB_EXECUTEMANY_MODE', 'values_plus_batch'),
+    # Lignes par instruction des INSERT multi-lignes, et par lot d'execute_batch
+    'executemany_page_size': int(os.getenv('DB_EXECUTEMANY_PAGE_SIZE', 1000))
 }
 
 # Configuration des chemins
@@ -18,11 +28,88 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__fil
 DATA_PATHS = {
     'raw': os.path.join(BASE_DIR, 'data', 'raw'),
     'processed': os.path.join(BASE_DIR, 'data', 'processed'),
-    'temp': os.path.join(BASE_DIR, 'data', 'temp')
+    'temp': os.path.join(BASE_DIR, 'data', 'temp'),
+    'quarantine': os.path.join(BASE_DIR, 'data', 'quarantine'),
+    'reference': os.path.join(BASE_DIR, 'data', 'reference')
 }
 
 # Configuration des sources de données
 DATA_SOURCES = {
     'covid19': os.path.join(DATA_PATHS['raw'], 'covid19_global_cases.csv'),
-    'mpox': os.path.join(DATA_PATHS['raw'], 'mpox_global_cases.csv')
+    'mpox': os.path.join(DATA_PATHS['raw'], 'mpox_global_cases.csv'),
+    # Table de référence : population de chaque pays (clé : nom du pays après nettoyage)
+    'population': os.path.join(DATA_PATHS['reference'], 'population.csv')
+}
+
+# Configuration du chargement
+LOAD_CONFIG = {
+    # 'copy' : chargement en masse via COPY FROM STDIN, 'orm' : chargement ligne à ligne via l'ORM
+    'mode': os.getenv('ETL_LOAD_MODE', 'copy'),
+    # Nombre de lignes par instruction INSERT ... ON CONFLICT
+    'batch_size': int(os.getenv('ETL_BATCH_SIZE', 1000)),
+    # Nombre de partitions (épidémies) chargées en parallèle, borné par la taille du pool (1 = séquentiel)
+    'workers': int(os.getenv('ETL_LOAD_WORKERS', 1)),
+    # Nouvelles tentatives d'une partition après une erreur transitoire, et délai initial en secondes
+    'retries': int(os.getenv('ETL_LOAD_RETRIES', 2)),
+    'retry_delay': float(os.getenv('ETL_LOAD_RETRY_DELAY', 1)),
+    # Lignes par transaction journalisée en mode COPY séquentiel (point de reprise après un échec)
+    'checkpoint_rows': int(os.getenv('ETL_CHECKPOINT_ROWS', 20000)),
+    # Mode ORM : lots de batch_size lignes validés ensemble (un savepoint par lot)
+    'commit_interval': int(os.getenv('ETL_COMMIT_INTERVAL', 10))
+}
+
+
+# Configuration du pipeline
+ETL_CONFIG = {
+    # Mode incrémental : ne traite que les dates postérieures à la dernière date chargée
+    'incremental': os.getenv('ETL_INCREMENTAL', 'false').lower() in ('1', 'true', 'yes'),
+    # Jours d'historique conservés avant la dernière date chargée (diff, moyennes mobiles)
+    'lookback_days': int(os.getenv('ETL_LOOKBACK_DAYS', 7)),
+    # Fenêtre des moyennes mobiles en jours (l'historique conservé couvre au moins cette fenêtre)
+    'rolling_window': int(os.getenv('ETL_ROLLING_WINDOW', 7)),
+    # Mode streaming : nombre de lignes lues par bloc (0 = lecture du fichier en une fois)
+    'chunksize': int(os.getenv('ETL_CHUNKSIZE', 0)),
+    # Mode parallèle : extraction et transformation de chaque maladie dans un processus dédié
+    'parallel': os.getenv('ETL_PARALLEL', 'false').lower() in ('1', 'true', 'yes'),
+    # Quarantaine : lignes invalides écrites dans data/quarantine au lieu de rejeter tout le fichier
+    'quarantine': os.getenv('ETL_QUARANTINE', 'false').lower() in ('1', 'true', 'yes'),
+    # Agrégats hebdomadaires, mensuels et régionaux recalculés après le chargement
+    'rollups': os.getenv('ETL_ROLLUPS', 'true').lower() in ('1', 'true', 'yes')
+}
+
+# Configuration du cache des DataFrames transformés (data/processed)
+CACHE_CONFIG = {
+    'enabled': os.getenv('ETL_CACHE', 'true').lower() in ('1', 'true', 'yes'),
+    # À incrémenter lorsque le code d'extraction ou de transformation change
+    'version': '1'
+}
+
+# Configuration de l'API de lecture des statistiques chargées
+QUERY_CONFIG = {
+    # Nombre de résultats conservés dans le cache LRU (0 = pas de cache)
+    'cache_size': int(os.getenv('ETL_QUERY_CACHE_SIZE', 256)),
+    # Durée de vie d'un résultat en cache, en secondes (0 = sans expiration)
+    'ttl': float(os.getenv('ETL_QUERY_CACHE_TTL', 300)),
+    # Intervalle minimal, en secondes, entre deux lectures du journal de chargement
+    # qui invalident les résultats touchés par un autre processus (0 = avant chaque lecture)
+    'version_interval': float(os.getenv('ETL_QUERY_VERSION_INTERVAL', 5))
+}
+
+# Configuration des métriques d'exécution
+METRICS_CONFIG = {
+    # Dossier des rapports JSON d'exécution (un fichier par exécution)
+    'report_dir': os.getenv('ETL_METRICS_DIR', 'logs'),
+    # Fichier au format texte Prometheus, réécrit à chaque exécution ('' = pas d'export)
+    'prometheus_file': os.getenv('ETL_METRICS_PROMETHEUS', '')
+}
+
+# Configuration des logs
+LOG_CONFIG = {
+    'level': os.getenv('ETL_LOG_LEVEL', 'INFO').upper(),
+    # 'text' : format historique, 'json' : une ligne JSON par message
+    'format': os.getenv('ETL_LOG_FORMAT', 'text').lower(),
+    'dir': os.getenv('ETL_LOG_DIR', 'logs'),
+    # Messages DEBUG/INFO conservés par emplacement d'appel et par intervalle (en secondes) ; 0 = pas de limite
+    'rate_limit': int(os.getenv('ETL_LOG_RATE_LIMIT', 50)),
+    'rate_interval': float(os.getenv('ETL_LOG_RATE_INTERVAL', 60))
 }
\ No newline at end of file
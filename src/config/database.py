@@ -1,6 +1,9 @@
-from sqlalchemy import create_engine, MetaData
+import threading
+import time
+from sqlalchemy import create_engine, event, MetaData
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import SQLAlchemyError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
 from .config import DB_CONFIG
 from src.utils.logger import setup_logger
 
@@ -9,27 +12,156 @@ logger = setup_logger('database')
 def get_connection_string():
     return f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}"
 
+class PoolStats:
+    """Compteurs du pool de connexions, alimentés par ses événements"""
+
+    def __init__(self):
+        self._verrou = threading.Lock()
+        self.checkouts = 0
+        self.attente_totale = 0.0
+        self.attente_max = 0.0
+        self.timeouts = 0
+        self.en_cours = 0
+        self.pic_en_cours = 0
+        self.connexions_ouvertes = 0
+        self.connexions_fermees = 0
+        self.invalidations = 0
+
+    def record_wait(self, secondes, timeout=False):
+        with self._verrou:
+            if timeout:
+                self.timeouts += 1
+                return
+            self.attente_totale += secondes
+            self.attente_max = max(self.attente_max, secondes)
+
+    def on_checkout(self, *args):
+        with self._verrou:
+            self.checkouts += 1
+            self.en_cours += 1
+            self.pic_en_cours = max(self.pic_en_cours, self.en_cours)
+
+    def on_checkin(self, *args):
+        with self._verrou:
+            self.en_cours = max(0, self.en_cours - 1)
+
+    def on_connect(self, *args):
+        with self._verrou:
+            self.connexions_ouvertes += 1
+
+    def on_close(self, *args):
+        with self._verrou:
+            self.connexions_fermees += 1
+
+    def on_invalidate(self, *args):
+        with self._verrou:
+            self.invalidations += 1
+
+    def snapshot(self):
+        with self._verrou:
+            return {
+                'checkouts': self.checkouts,
+                'attente_moyenne_ms': round(self.attente_totale / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                'attente_max_ms': round(self.attente_max * 1000, 3),
+                'timeouts': self.timeouts,
+                'en_cours': self.en_cours,
+                'pic_en_cours': self.pic_en_cours,
+                'connexions_ouvertes': self.connexions_ouvertes,
+                'connexions_fermees': self.connexions_fermees,
+                'invalidations': self.invalidations
+            }
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool qui mesure l'attente de chaque emprunt de connexion et compte les dépassements de délai"""
+
+    stats = None
+
+    def connect(self):
+        debut = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            if self.stats:
+                self.stats.record_wait(time.perf_counter() - debut, timeout=True)
+            raise
+        if self.stats:
+            self.stats.record_wait(time.perf_counter() - debut)
+        return connection
+
+    def recreate(self):
+        # dispose() remplace le pool : les compteurs sont conservés
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
 class DatabaseManager:
     def __init__(self):
         self.engine = None
         self.session_maker = None
         self.metadata = MetaData()
+        self.pool_stats = PoolStats()
+        self._verrou = threading.Lock()
 
-    def connect(self):
-        try:
-            connection_string = get_connection_string()
-            self.engine = create_engine(
-                connection_string,
-                pool_size=20,
-                max_overflow=0,
-                pool_timeout=30,
-                pool_recycle=1800
-            )
-            self.session_maker = sessionmaker(bind=self.engine)
-            logger.info("Connexion à la base de données établie avec succès")
-        except SQLAlchemyError as e:
-            logger.error(f"Erreur de connexion à la base de données: {str(e)}")
-            raise
+    def connect(self, connection_string=None):
+        # Idempotent et sûr entre threads : un seul moteur (et un seul pool) par gestionnaire
+        if self.engine is not None:
+            return self.engine
+        with self._verrou:
+            if self.engine is not None:
+                return self.engine
+            try:
+                engine = create_engine(
+                    connection_string or get_connection_string(),
+                    poolclass=InstrumentedQueuePool,
+                    pool_size=DB_CONFIG['pool_size'],
+                    max_overflow=DB_CONFIG['max_overflow'],
+                    pool_timeout=DB_CONFIG['pool_timeout'],
+                    pool_recycle=DB_CONFIG['pool_recycle'],
+                    pool_pre_ping=DB_CONFIG['pool_pre_ping'],
+                    executemany_mode=DB_CONFIG['executemany_mode'],
+                    executemany_batch_page_size=DB_CONFIG['executemany_page_size'],
+                    insertmanyvalues_page_size=DB_CONFIG['executemany_page_size']
+                )
+                self.watch_pool(engine)
+                self.session_maker = sessionmaker(bind=engine)
+                self.engine = engine
+                logger.info("Connexion à la base de données établie avec succès")
+                return self.engine
+            except SQLAlchemyError as e:
+                logger.error(f"Erreur de connexion à la base de données: {str(e)}")
+                raise
+
+    def watch_pool(self, engine):
+        """Relie les événements du pool aux compteurs de pool_stats"""
+        engine.pool.stats = self.pool_stats
+        event.listen(engine, 'checkout', self.pool_stats.on_checkout)
+        event.listen(engine, 'checkin', self.pool_stats.on_checkin)
+        event.listen(engine, 'connect', self.pool_stats.on_connect)
+        event.listen(engine, 'close', self.pool_stats.on_close)
+        event.listen(engine, 'invalidate', self.pool_stats.on_invalidate)
+
+    def stats(self):
+        """État du pool et compteurs depuis la connexion : emprunts, attentes, dépassements, renouvellement"""
+        if self.engine is None:
+            return {}
+        pool = self.engine.pool
+        etat = {
+            'pool_size': pool.size(),
+            'max_overflow': DB_CONFIG['max_overflow'],
+            'connexions_empruntees': pool.checkedout(),
+            'connexions_disponibles': pool.checkedin(),
+            'overflow': pool.overflow()
+        }
+        etat.update(self.pool_stats.snapshot())
+        return etat
+
+    def dispose(self):
+        """Ferme les connexions du pool ; un prochain connect() crée un nouveau moteur"""
+        with self._verrou:
+            if self.engine is not None:
+                self.engine.dispose()
+            self.engine = None
+            self.session_maker = None
 
     def get_session(self):
         if not self.session_maker:
@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
 import pandas as pd
 import numpy as np
+import os
 from datetime import datetime
+from src.config.config import DATA_PATHS, ETL_CONFIG
 from src.utils.logger import setup_logger
 
 logger = setup_logger('extractors')
@@ -9,20 +11,84 @@ logger = setup_logger('extractors')
 class BaseExtractor(ABC):
     def __init__(self, file_path):
         self.file_path = file_path
+        # Schéma déclaré par les classes filles : colonnes lues, types et colonne de date
+        self.usecols = None
+        self.dtypes = None
+        self.date_column = None
+        self.numeric_columns = []
+        # Quarantaine : les lignes invalides sont écartées au lieu de rejeter tout le fichier
+        self.quarantine = ETL_CONFIG['quarantine']
+        self.quarantine_path = None
         
     @abstractmethod
     def validate_data(self, df): # cette méthode est abstraite sera implémentée dans les classes filles( CovidExtractor et MpoxExtractor)
-        """Valide le DataFrame"""
+        """Valide le DataFrame et retourne un ValidationReport"""
         pass
 
-    def validate_dates(self, df, date_column):
-        """Valide le format des dates"""
-        try:
-            pd.to_datetime(df[date_column])
+    def numeric_dtypes(self):
+        """Types compacts des colonnes numériques, appliqués après validation"""
+        return {col: dtype for col, dtype in (self.dtypes or {}).items() if col in self.numeric_columns}
+
+    def read_options(self):
+        """Options de lecture du CSV selon le schéma déclaré"""
+        # Les colonnes numériques et la date sont converties par la validation, en une seule passe
+        dtypes = {col: dtype for col, dtype in (self.dtypes or {}).items() if col not in self.numeric_columns}
+        return {'usecols': self.usecols, 'dtype': dtypes or None}
+
+    def check_columns(self):
+        """Vérifie la présence des colonnes du schéma à partir de l'en-tête du fichier"""
+        if not self.usecols:
             return True
-        except Exception as e:
-            logger.error(f"Erreur de validation des dates: {str(e)}")
+        header = pd.read_csv(self.file_path, nrows=0).columns
+        missing_cols = [col for col in self.usecols if col not in header]
+        if missing_cols:
+            logger.error(f"Colonnes manquantes : {missing_cols}")
             return False
+        return True
+
+    def quarantine_rows(self, df, report):
+        """Écrit les lignes invalides dans data/quarantine et retourne le DataFrame sans elles"""
+        index = report.invalid_index()
+        rejets = df.loc[index].copy()
+        rejets['colonnes_en_erreur'] = ''
+        for col, lignes in report.invalid_rows.items():
+            rejets.loc[lignes, 'colonnes_en_erreur'] += col + ';'
+
+        # Premier écrit de l'extraction : le fichier est recréé, les blocs suivants y sont ajoutés
+        premier = self.quarantine_path is None
+        if premier:
+            os.makedirs(DATA_PATHS['quarantine'], exist_ok=True)
+            nom = os.path.splitext(os.path.basename(self.file_path))[0]
+            self.quarantine_path = os.path.join(DATA_PATHS['quarantine'], f"{nom}_quarantaine.csv")
+        rejets.to_csv(self.quarantine_path, mode='w' if premier else 'a', header=premier, index=False)
+
+        logger.warning(f"{len(index)} lignes mises en quarantaine dans {self.quarantine_path} : {report.summary()}")
+        return report.data.drop(index)
+
+    def apply_validation(self, df, report, bloc=None):
+        """Rejette les données ou met en quarantaine les lignes invalides, puis applique les types compacts"""
+        if not report:
+            origine = f" (bloc {bloc})" if bloc is not None else ""
+            if report.missing_columns or not self.quarantine:
+                raise ValueError(f"Échec de la validation des données{origine} : {report.summary()}")
+            return self.quarantine_rows(df, report).astype(self.numeric_dtypes())
+        return report.data.astype(self.numeric_dtypes())
+
+    def remove_duplicates_across_chunks(self, df, cles_vues):
+        """Supprime les doublons d'un bloc, y compris ceux déjà vus dans les blocs précédents"""
+        # Une empreinte 64 bits par ligne : seul l'ensemble des empreintes est conservé entre les blocs
+        empreintes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        nouvelles = ~pd.Series(empreintes).duplicated().to_numpy()
+        deja_vues = np.fromiter((empreinte in cles_vues for empreinte in empreintes.tolist()),
+                                dtype=bool, count=len(empreintes))
+        masque = nouvelles & ~deja_vues
+        cles_vues.update(empreintes[masque].tolist())
+
+        duplicates = len(df) - int(masque.sum())
+        if duplicates > 0:
+            logger.info(f"{duplicates} doublons supprimés")
+            df = df[masque]
+        return df
 
     def remove_duplicates(self, df):
         """Supprime les doublons"""
@@ -35,27 +101,34 @@ class BaseExtractor(ABC):
 
     def clean_basic(self, df):
         """Nettoyage basique des données"""
+        # Un seul repérage des valeurs manquantes : sans elles, le DataFrame est rendu tel quel
+        manquantes = df.isna().to_numpy()
+        if not manquantes.any():
+            return df
+
         # Suppression des lignes vides
-        df = df.dropna(how='all')
-        
-        # Remplacement des valeurs NaN par 0 pour les colonnes numériques
+        vides = manquantes.all(axis=1)
+        if vides.any():
+            df = df[~vides]
+
+        # Remplacement des valeurs NaN par 0 pour les colonnes numériques (les autres colonnes ne sont pas copiées)
         numeric_columns = df.select_dtypes(include=[np.number]).columns
-        df[numeric_columns] = df[numeric_columns].fillna(0)
-        
-        return df
+        return df.fillna({col: 0 for col in numeric_columns})
 
     def extract(self):
         """Extrait et nettoie les données du fichier"""
         try:
             logger.info(f"Début de l'extraction : {self.file_path}")
             
-            # Lecture du CSV
-            df = pd.read_csv(self.file_path)
+            # Lecture du CSV selon le schéma déclaré
+            if not self.check_columns():
+                raise ValueError("Échec de la validation des données")
+            df = pd.read_csv(self.file_path, **self.read_options())
             logger.info(f"Données brutes chargées : {df.shape[0]} lignes")
 
-            # Validation
-            if not self.validate_data(df):
-                raise ValueError("Échec de la validation des données")
+            # Validation et conversion des colonnes en une seule passe
+            self.quarantine_path = None
+            df = self.apply_validation(df, self.validate_data(df))
 
             # Nettoyage
             df = self.clean_basic(df)
@@ -64,6 +137,35 @@ class BaseExtractor(ABC):
             logger.info(f"Extraction terminée : {df.shape[0]} lignes valides")
             return df
 
+        except Exception as e:
+            logger.error(f"Erreur lors de l'extraction : {str(e)}")
+            raise
+
+    def extract_chunks(self, chunksize):
+        """Extrait le fichier par blocs validés et nettoyés (générateur)"""
+        try:
+            logger.info(f"Début de l'extraction par blocs de {chunksize} lignes : {self.file_path}")
+            cles_vues = set()
+            total = 0
+            self.quarantine_path = None
+
+            if not self.check_columns():
+                raise ValueError("Échec de la validation des données")
+
+            with pd.read_csv(self.file_path, chunksize=chunksize, **self.read_options()) as reader:
+                for numero, df in enumerate(reader):
+                    # Validation et conversion des colonnes en une seule passe
+                    df = self.apply_validation(df, self.validate_data(df), bloc=numero)
+
+                    # Nettoyage
+                    df = self.clean_basic(df)
+                    df = self.remove_duplicates_across_chunks(df, cles_vues)
+
+                    total += len(df)
+                    yield df
+
+            logger.info(f"Extraction terminée : {total} lignes valides")
+
         except Exception as e:
             logger.error(f"Erreur lors de l'extraction : {str(e)}")
             raise
\ No newline at end of file
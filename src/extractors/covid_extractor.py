@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 from .base_extractor import BaseExtractor
+from src.utils.validator import validate_and_convert
 from src.utils.logger import setup_logger
 
 logger = setup_logger('covid_extractor')
@@ -11,31 +12,28 @@ class CovidExtractor(BaseExtractor):
         self.required_columns = [
             'Date', 'Country/Region', 'Confirmed', 
             'Deaths', 'Recovered', 'Active',
-            'New cases', 'New deaths', 'New recovered',
             'WHO Region'
         ]
         self.numeric_columns = [
             'Confirmed', 'Deaths', 'Recovered', 
-            'Active', 'New cases', 'New deaths', 
-            'New recovered'
+            'Active'
         ]
+
+        # Schéma de lecture : seules les colonnes utilisées par le pipeline sont chargées
+        self.usecols = self.required_columns
+        self.dtypes = {
+            'Country/Region': 'category',
+            'WHO Region': 'category',
+            'Confirmed': 'int32',
+            'Deaths': 'int32',
+            'Recovered': 'int32',
+            'Active': 'int32'
+        }
+        self.date_column = 'Date'
     
     def validate_data(self, df):
         """Valide les données COVID-19"""
-        # Vérification des colonnes requises
-        missing_cols = [col for col in self.required_columns if col not in df.columns]
-        if missing_cols:
-            logger.error(f"Colonnes manquantes : {missing_cols}")
-            return False
-
-        # Validation des dates
-        if not self.validate_dates(df, 'Date'):
-            return False
-
-        # Validation des types numériques
-        for col in self.numeric_columns:
-            if not pd.to_numeric(df[col], errors='coerce').notnull().all():
-                logger.error(f"Valeurs non numériques dans la colonne : {col}")
-                return False
-
-        return True
\ No newline at end of file
+        report = validate_and_convert(df, self.required_columns, self.numeric_columns, self.date_column)
+        if not report:
+            logger.error(f"Données COVID-19 invalides : {report.summary()}")
+        return report
\ No newline at end of file
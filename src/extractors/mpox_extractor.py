@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 from .base_extractor import BaseExtractor
+from src.utils.validator import validate_and_convert
 from src.utils.logger import setup_logger
 
 logger = setup_logger('mpox_extractor')
@@ -11,36 +12,27 @@ class MpoxExtractor(BaseExtractor):
         self.required_columns = [
             'location', 'iso_code', 'date',
             'total_cases', 'total_deaths',
-            'new_cases', 'new_deaths',
-            'new_cases_smoothed', 'new_deaths_smoothed',
-            'new_cases_per_million', 'total_cases_per_million',
-            'new_cases_smoothed_per_million', 'new_deaths_per_million',
-            'total_deaths_per_million', 'new_deaths_smoothed_per_million'
+            'new_cases', 'new_deaths'
         ]
         self.numeric_columns = [
-            'total_cases', 'total_deaths', 'new_cases', 'new_deaths',
-            'new_cases_smoothed', 'new_deaths_smoothed',
-            'new_cases_per_million', 'total_cases_per_million',
-            'new_cases_smoothed_per_million', 'new_deaths_per_million',
-            'total_deaths_per_million', 'new_deaths_smoothed_per_million'
+            'total_cases', 'total_deaths', 'new_cases', 'new_deaths'
         ]
 
+        # Schéma de lecture : les colonnes lissées et par million ne sont pas utilisées
+        self.usecols = self.required_columns
+        self.dtypes = {
+            'location': 'category',
+            'iso_code': 'category',
+            'total_cases': 'float32',
+            'total_deaths': 'float32',
+            'new_cases': 'float32',
+            'new_deaths': 'float32'
+        }
+        self.date_column = 'date'
+
     def validate_data(self, df):
         """Valide les données MPOX"""
-        # Vérification des colonnes requises
-        missing_cols = [col for col in self.required_columns if col not in df.columns]
-        if missing_cols:
-            logger.error(f"Colonnes manquantes : {missing_cols}")
-            return False
-
-        # Validation des dates
-        if not self.validate_dates(df, 'date'):
-            return False
-
-        # Validation des types numériques
-        for col in self.numeric_columns:
-            if not pd.to_numeric(df[col], errors='coerce').notnull().all():
-                logger.error(f"Valeurs non numériques dans la colonne : {col}")
-                return False
-
-        return True
\ No newline at end of file
+        report = validate_and_convert(df, self.required_columns, self.numeric_columns, self.date_column)
+        if not report:
+            logger.error(f"Données MPOX invalides : {report.summary()}")
+        return report
\ No newline at end of file
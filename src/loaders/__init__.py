@@ -1,3 +1,6 @@
 from .postgres_loader import PostgresLoader
+from .id_resolver import IdResolver
+from .rollup_loader import RollupLoader
+from .unit_of_work import UnitOfWork
 
-__all__ = ['PostgresLoader']
\ No newline at end of file
+__all__ = ['PostgresLoader', 'IdResolver', 'RollupLoader', 'UnitOfWork']
\ No newline at end of file
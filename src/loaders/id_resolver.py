@@ -0,0 +1,67 @@
+from sqlalchemy.exc import SQLAlchemyError
+from src.models import Pays, EpidemiePays
+from src.utils.logger import setup_logger
+
+logger = setup_logger('id_resolver')
+
+class IdResolver:
+    """Résout en mémoire les identifiants des pays et des épidémies"""
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self.pays_par_nom = {}       # nom_pays -> id_pays
+        self.pays_par_iso = {}       # code_iso -> id_pays
+        self.epidemies = {}          # (id_pays, id_maladie) -> id_epidemie
+        self.loaded = False
+
+    def load(self):
+        """Charge les correspondances depuis la base (une requête par table)"""
+        session = self.db_manager.get_session()
+        try:
+            self.pays_par_nom.clear()
+            self.pays_par_iso.clear()
+            self.epidemies.clear()
+
+            for id_pays, nom_pays, code_iso in session.query(Pays.id_pays, Pays.nom_pays, Pays.code_iso):
+                self.register_pays(id_pays, nom_pays, code_iso)
+
+            for id_epidemie, id_pays, id_maladie in session.query(
+                EpidemiePays.id_epidemie, EpidemiePays.id_pays, EpidemiePays.id_maladie
+            ):
+                self.register_epidemie(id_epidemie, id_pays, id_maladie)
+
+            self.loaded = True
+            logger.info(f"Identifiants chargés : {len(self.pays_par_nom)} pays, {len(self.epidemies)} épidémies")
+        except SQLAlchemyError as e:
+            logger.error(f"Erreur lors du chargement des identifiants: {str(e)}")
+            raise
+        finally:
+            session.close()
+
+    def _ensure_loaded(self):
+        if not self.loaded:
+            self.load()
+
+    def get_pays_id(self, nom_pays=None, code_iso=None):
+        """Obtient l'ID d'un pays à partir de son nom ou de son code ISO"""
+        self._ensure_loaded()
+        if nom_pays is not None and nom_pays in self.pays_par_nom:
+            return self.pays_par_nom[nom_pays]
+        if code_iso is not None:
+            return self.pays_par_iso.get(code_iso)
+        return None
+
+    def get_epidemie_id(self, id_pays, id_maladie):
+        """Obtient l'ID d'une épidémie à partir du pays et de la maladie"""
+        self._ensure_loaded()
+        return self.epidemies.get((id_pays, id_maladie))
+
+    def register_pays(self, id_pays, nom_pays, code_iso=None):
+        """Enregistre un pays inséré ou mis à jour par le loader"""
+        self.pays_par_nom[nom_pays] = id_pays
+        if code_iso:
+            self.pays_par_iso[code_iso] = id_pays
+
+    def register_epidemie(self, id_epidemie, id_pays, id_maladie):
+        """Enregistre une épidémie insérée ou mise à jour par le loader"""
+        self.epidemies[(id_pays, id_maladie)] = id_epidemie
@@ -1,81 +1,225 @@
-from sqlalchemy.exc import SQLAlchemyError
+import csv
+import io
+import time
+import uuid
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import pandas as pd
+import psycopg2
+from psycopg2.extras import execute_values
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError, OperationalError
 from .base_loader import BaseLoader
-from src.models import Pays, Maladie, EpidemiePays, StatistiquesQuotidiennes, StatistiquesDetaillees
+from .id_resolver import IdResolver
+from .unit_of_work import UnitOfWork
+from src.config.config import LOAD_CONFIG
+from src.queries import stats_queries
+from src.utils.metrics import RunMetrics
+from src.models import (Pays, Maladie, EpidemiePays, StatistiquesQuotidiennes, StatistiquesDetaillees,
+                        ExecutionEtl, JournalChargement)
+
+# Préfixe des clés de statistiques selon la maladie
+PREFIXES_MALADIES = {1: 'covid', 2: 'mpox'}
+
+# Erreurs transitoires (connexion perdue, interblocage...) pour lesquelles une partition est relancée
+ERREURS_TRANSITOIRES = (OperationalError, psycopg2.OperationalError)
+
+# Colonnes mises à jour en cas de conflit lors des upserts
+COLONNES_QUOTIDIENNES = [
+    'cas_total', 'deces_total', 'nouveaux_cas', 'nouveaux_deces', 'cas_actifs', 'cas_gueris'
+]
+COLONNES_DETAILLEES = [
+    'cas_par_million', 'deces_par_million', 'moyenne_mobile_cas', 'moyenne_mobile_deces'
+]
+
+# Colonnes de la table de transit utilisée par le chargement COPY
+COLONNES_STAGING = [
+    'id_epidemie', 'date_observation', 'cas_total', 'deces_total',
+    'nouveaux_cas', 'nouveaux_deces', 'cas_actifs', 'cas_gueris',
+    'cas_par_million', 'deces_par_million', 'moyenne_mobile_cas', 'moyenne_mobile_deces',
+    'hash_contenu'
+]
+
+CREATE_STAGING_SQL = """
+    CREATE TEMP TABLE staging_statistiques (
+        id_epidemie integer NOT NULL,
+        date_observation date NOT NULL,
+        cas_total double precision,
+        deces_total double precision,
+        nouveaux_cas double precision,
+        nouveaux_deces double precision,
+        cas_actifs double precision,
+        cas_gueris double precision,
+        cas_par_million double precision,
+        deces_par_million double precision,
+        moyenne_mobile_cas double precision,
+        moyenne_mobile_deces double precision,
+        hash_contenu bigint
+    ) ON COMMIT DROP
+"""
+
+COPY_STAGING_SQL = f"COPY staging_statistiques ({', '.join(COLONNES_STAGING)}) FROM STDIN WITH (FORMAT csv)"
+
+# Fusion ensembliste de la table de transit dans les tables définitives :
+# les statistiques déjà présentes sont mises à jour avec les valeurs corrigées
+MERGE_STAGING_SQL = """
+    WITH source AS (
+        SELECT DISTINCT ON (id_epidemie, date_observation) *
+        FROM staging_statistiques
+        ORDER BY id_epidemie, date_observation
+    ),
+    upserts AS (
+        INSERT INTO statistiques_quotidiennes (
+            id_epidemie, date_observation, cas_total, deces_total,
+            nouveaux_cas, nouveaux_deces, cas_actifs, cas_gueris, hash_contenu
+        )
+        SELECT s.id_epidemie, s.date_observation,
+               COALESCE(s.cas_total, 0), COALESCE(s.deces_total, 0),
+               COALESCE(s.nouveaux_cas, 0), COALESCE(s.nouveaux_deces, 0),
+               COALESCE(s.cas_actifs, 0), COALESCE(s.cas_gueris, 0), s.hash_contenu
+        FROM source s
+        ON CONFLICT (id_epidemie, date_observation) DO UPDATE SET
+            cas_total = EXCLUDED.cas_total,
+            deces_total = EXCLUDED.deces_total,
+            nouveaux_cas = EXCLUDED.nouveaux_cas,
+            nouveaux_deces = EXCLUDED.nouveaux_deces,
+            cas_actifs = EXCLUDED.cas_actifs,
+            cas_gueris = EXCLUDED.cas_gueris,
+            hash_contenu = EXCLUDED.hash_contenu
+        -- Ligne inchangée : aucune réécriture (ni WAL ni index)
+        WHERE EXCLUDED.hash_contenu IS NULL
+           OR statistiques_quotidiennes.hash_contenu IS DISTINCT FROM EXCLUDED.hash_contenu
+        RETURNING id_stat, id_epidemie, date_observation
+    )
+    INSERT INTO statistiques_detaillees (
+        id_stat, cas_par_million, deces_par_million, moyenne_mobile_cas, moyenne_mobile_deces
+    )
+    SELECT u.id_stat,
+           COALESCE(s.cas_par_million, 0), COALESCE(s.deces_par_million, 0),
+           COALESCE(s.moyenne_mobile_cas, 0), COALESCE(s.moyenne_mobile_deces, 0)
+    FROM upserts u
+    JOIN source s ON s.id_epidemie = u.id_epidemie AND s.date_observation = u.date_observation
+    ON CONFLICT (id_stat) DO UPDATE SET
+        cas_par_million = EXCLUDED.cas_par_million,
+        deces_par_million = EXCLUDED.deces_par_million,
+        moyenne_mobile_cas = EXCLUDED.moyenne_mobile_cas,
+        moyenne_mobile_deces = EXCLUDED.moyenne_mobile_deces
+"""
+
+# Journal des partitions, écrit dans la transaction qui charge la partition
+JOURNAL_SQL = """
+    INSERT INTO journal_chargement (run_id, id_epidemie, date_debut, date_fin, nb_lignes)
+    VALUES %s
+    ON CONFLICT ON CONSTRAINT uq_journal_chargement_partition DO NOTHING
+"""
+
+# Empreintes stockées des statistiques, restreintes à la plage de dates de chaque épidémie chargée
+EMPREINTES_SQL = text("""
+    SELECT q.id_epidemie, q.date_observation, q.hash_contenu
+    FROM statistiques_quotidiennes q
+    JOIN unnest(:ids, :debuts, :fins) AS r(id_epidemie, date_debut, date_fin)
+      ON q.id_epidemie = r.id_epidemie AND q.date_observation BETWEEN r.date_debut AND r.date_fin
+    WHERE q.hash_contenu IS NOT NULL
+""")
 
 class PostgresLoader(BaseLoader):
-    def __init__(self, db_manager):
+    def __init__(self, db_manager, mode=None, batch_size=None, resolver=None, workers=None, metrics=None, queries=None,
+                 commit_interval=None):
         super().__init__(db_manager)
+        self.resolver = resolver or IdResolver(db_manager)
+        self.mode = mode or LOAD_CONFIG['mode']
+        self.batch_size = batch_size or LOAD_CONFIG['batch_size']
+        self.commit_interval = commit_interval or LOAD_CONFIG['commit_interval']
+        self.workers = workers or LOAD_CONFIG['workers']
+        self.metrics = metrics or RunMetrics()
+        # Exécution journalisée en cours et partitions déjà chargées par elle (reprise)
+        self.run_id = None
+        self.partitions_chargees = set()
+        # Plage complète de chaque partition du chargement en cours, avant la détection des changements
+        self.plages_partitions = {}
+        # Plage de dates écrite par épidémie depuis le début de l'exécution (agrégats à recalculer)
+        self.plages_modifiees = {}
+        # Lignes rejetées (lots annulés) depuis le début de l'exécution : l'exécution n'est alors pas un succès
+        self.lignes_rejetees = 0
+        # Cache de lecture invalidé après chaque validation, et maladie de chaque épidémie chargée
+        self.queries = queries or stats_queries
+        self.maladies_epidemies = {}
+
+    def _lots(self, lignes):
+        """Découpe une liste de lignes en lots de taille batch_size"""
+        for debut in range(0, len(lignes), self.batch_size):
+            yield lignes[debut:debut + self.batch_size]
 
     def load_pays(self, pays_data):
-        """Charge et met à jour les données des pays"""
+        """Charge et met à jour les données des pays (upsert par lots)"""
+        session = self.db_manager.get_session()
         try:
-            session = self.db_manager.get_session()
+            # Dédoublonnage sur la clé de conflit : une instruction ne peut pas toucher deux fois la même ligne
+            lignes = {}
             for pays in pays_data:
-                try:
-                    # Vérification des données
-                    code_iso = pays.get('code_iso')  # Utilisation de get() pour éviter KeyError
-                    region_oms = pays.get('region_oms')
-                    
-                    # Chercher si le pays existe
-                    existant = session.query(Pays).filter_by(nom_pays=pays['nom_pays']).first()
-                    if existant:
-                        # Mettre à jour les données manquantes
-                        if existant.code_iso is None and code_iso:
-                            existant.code_iso = code_iso
-                            self.logger.info(f"Mise à jour code ISO pour {pays['nom_pays']}: {code_iso}")
-                            
-                        if existant.region_oms is None and region_oms:
-                            existant.region_oms = region_oms
-                            self.logger.info(f"Mise à jour région OMS pour {pays['nom_pays']}: {region_oms}")
-                    else:
-                        # Ajouter un nouveau pays
-                        nouveau_pays = Pays(
-                            nom_pays=pays['nom_pays'],
-                            code_iso=code_iso,
-                            region_oms=region_oms
-                        )
-                        session.add(nouveau_pays)
-                        self.logger.info(f"Nouveau pays ajouté: {pays['nom_pays']}")
-                        
-                except Exception as e:
-                    self.logger.error(f"Erreur lors du traitement du pays {pays.get('nom_pays', 'inconnu')}: {str(e)}")
-                    continue
-                
+                code_iso = pays.get('code_iso')  # Utilisation de get() pour éviter KeyError
+                if code_iso and len(code_iso) > 3:
+                    # Codes OWID_* des agrégats régionaux : pas des codes ISO alpha-3
+                    code_iso = None
+                lignes[pays['nom_pays']] = {
+                    'nom_pays': pays['nom_pays'],
+                    'code_iso': code_iso,
+                    'region_oms': pays.get('region_oms'),
+                    'population': pays.get('population')
+                }
+
+            for lot in self._lots(list(lignes.values())):
+                stmt = insert(Pays).values(lot)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[Pays.nom_pays],
+                    set_={
+                        # Les nouvelles valeurs corrigent l'existant sans jamais l'effacer
+                        'code_iso': func.coalesce(stmt.excluded.code_iso, Pays.code_iso),
+                        'region_oms': func.coalesce(stmt.excluded.region_oms, Pays.region_oms),
+                        'population': func.coalesce(stmt.excluded.population, Pays.population)
+                    }
+                ).returning(Pays.id_pays, Pays.nom_pays, Pays.code_iso)
+                for id_pays, nom_pays, code_iso in session.execute(stmt):
+                    self.resolver.register_pays(id_pays, nom_pays, code_iso)
+
             session.commit()
-            self.logger.info("Données pays chargées et mises à jour avec succès")
-                
+            self.logger.info(f"Données pays chargées et mises à jour avec succès : {len(lignes)} pays")
+
         except SQLAlchemyError as e:
             session.rollback()
             self.logger.error(f"Erreur lors du chargement/mise à jour des pays: {str(e)}")
             raise
         finally:
             session.close()  # Toujours fermer la session
-            
+
     def load_epidemie(self, epidemie_data):
-        """Charge les données d'épidémie"""
+        """Charge les données d'épidémie (upsert par lots)"""
+        session = self.db_manager.get_session()
         try:
-            session = self.db_manager.get_session()
-            epidemies = {}
+            lignes = {}
             for epidemie in epidemie_data:
-                existante = session.query(EpidemiePays).filter_by(
-                    id_pays=epidemie['id_pays'],
-                    id_maladie=epidemie['id_maladie']
-                ).first()
-                
-                if not existante:
-                    nouvelle_epidemie = EpidemiePays(
-                        id_pays=epidemie['id_pays'],
-                        id_maladie=epidemie['id_maladie'],
-                        date_premier_cas=epidemie['date_premier_cas'],
-                        statut=epidemie['statut']
-                    )
-                    session.add(nouvelle_epidemie)
-                    session.flush()  # Pour obtenir l'id_epidemie
-                    key = f"{epidemie['id_pays']}_{epidemie['id_maladie']}"
-                    epidemies[key] = nouvelle_epidemie.id_epidemie
-                else:
-                    key = f"{epidemie['id_pays']}_{epidemie['id_maladie']}"
-                    epidemies[key] = existante.id_epidemie
+                lignes[(epidemie['id_pays'], epidemie['id_maladie'])] = {
+                    'id_pays': epidemie['id_pays'],
+                    'id_maladie': epidemie['id_maladie'],
+                    'date_premier_cas': epidemie['date_premier_cas'],
+                    'date_fin': epidemie.get('date_fin'),
+                    'statut': epidemie['statut']
+                }
+
+            epidemies = {}
+            for lot in self._lots(list(lignes.values())):
+                stmt = insert(EpidemiePays).values(lot)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[EpidemiePays.id_pays, EpidemiePays.id_maladie],
+                    set_={
+                        'date_premier_cas': func.least(EpidemiePays.date_premier_cas, stmt.excluded.date_premier_cas),
+                        'statut': stmt.excluded.statut
+                    }
+                ).returning(EpidemiePays.id_epidemie, EpidemiePays.id_pays, EpidemiePays.id_maladie)
+                for id_epidemie, id_pays, id_maladie in session.execute(stmt):
+                    epidemies[f"{id_pays}_{id_maladie}"] = id_epidemie
+                    self.resolver.register_epidemie(id_epidemie, id_pays, id_maladie)
 
             session.commit()
             self.logger.info(f"Données épidémie chargées avec succès")
@@ -84,87 +228,502 @@ class PostgresLoader(BaseLoader):
             session.rollback()
             self.logger.error(f"Erreur lors du chargement des épidémies: {str(e)}")
             raise
+        finally:
+            session.close()
 
-    def load_statistiques(self, stats_data, id_epidemie):
-        """Charge les statistiques quotidiennes et détaillées"""
+    def start_run(self, resume=False):
+        """Démarre une exécution journalisée, ou reprend la dernière exécution inachevée"""
+        session = self.db_manager.get_session()
         try:
-            session = self.db_manager.get_session()
-            
-            for stat in stats_data:
-                # Vérifier si la statistique existe déjà
-                existante = session.query(StatistiquesQuotidiennes).filter_by(
-                    id_epidemie=id_epidemie,
-                    date_observation=stat['date']
-                ).first()
-                
-                if not existante:
-                    # Si elle n'existe pas, créer une nouvelle
-                    nouvelle_stat = StatistiquesQuotidiennes(
-                        id_epidemie=id_epidemie,
-                        date_observation=stat['date'],
-                        cas_total=stat['cas_total'],
-                        deces_total=stat['deces_total'],
-                        nouveaux_cas=stat['nouveaux_cas'],
-                        nouveaux_deces=stat['nouveaux_deces'],
-                        cas_actifs=stat.get('cas_actifs', 0),
-                        cas_gueris=stat.get('cas_gueris', 0)
-                    )
-                    session.add(nouvelle_stat)
-                    session.flush()  # Pour obtenir l'id_stat
-
-                    # Stats détaillées
-                    stats_detail = StatistiquesDetaillees(
-                        id_stat=nouvelle_stat.id_stat,
-                        cas_par_million=stat.get('cas_par_million', 0),
-                        deces_par_million=stat.get('deces_par_million', 0),
-                        moyenne_mobile_cas=stat.get('moyenne_mobile_cas', 0),
-                        moyenne_mobile_deces=stat.get('moyenne_mobile_deces', 0)
-                    )
-                    session.add(stats_detail)
-                else:
-                    # Optionnel : Mettre à jour les statistiques existantes
-                    self.logger.info(f"Statistique déjà existante pour la date {stat['date']}")
-            
+            execution = None
+            if resume:
+                # Dernière exécution non réussie : interrompue (en_cours), en échec, ou partielle (lignes rejetées)
+                execution = session.query(ExecutionEtl).filter(ExecutionEtl.statut != 'succes'
+                ).order_by(ExecutionEtl.date_debut.desc()).first()
+                if execution is None:
+                    self.logger.info("Aucune exécution inachevée à reprendre : nouvelle exécution")
+
+            if execution is not None:
+                execution.statut = 'en_cours'
+                execution.date_fin = None
+                self.partitions_chargees = {
+                    (id_epidemie, date_debut, date_fin)
+                    for id_epidemie, date_debut, date_fin in session.query(
+                        JournalChargement.id_epidemie, JournalChargement.date_debut, JournalChargement.date_fin
+                    ).filter(JournalChargement.run_id == execution.run_id)
+                }
+                self.logger.info(f"Reprise de l'exécution {execution.run_id} : "
+                                 f"{len(self.partitions_chargees)} partitions déjà chargées")
+            else:
+                execution = ExecutionEtl(run_id=uuid.uuid4().hex[:12], statut='en_cours')
+                session.add(execution)
+                self.partitions_chargees = set()
+
+            # Partitions validées dont les agrégats n'ont pas été recalculés, quelle que soit l'exécution :
+            # une exécution en échec a pu en valider que les suivantes, sans --resume, ignorent comme inchangées
+            self.plages_modifiees = {}
+            self.lignes_rejetees = 0
+            for id_epidemie, date_debut, date_fin in session.query(
+                JournalChargement.id_epidemie, JournalChargement.date_debut, JournalChargement.date_fin
+            ).filter(JournalChargement.agregats_a_jour.isnot(True)):
+                self.record_range(id_epidemie, date_debut, date_fin)
+
+            self.run_id = execution.run_id
+            session.commit()
+            return self.run_id
+        except SQLAlchemyError as e:
+            session.rollback()
+            self.logger.error(f"Erreur lors du démarrage de l'exécution: {str(e)}")
+            raise
+        finally:
+            session.close()
+
+    def finish_run(self, statut):
+        """Clôt l'exécution journalisée en cours (succes, partiel ou echec)"""
+        if self.run_id is None:
+            return
+        session = self.db_manager.get_session()
+        try:
+            session.query(ExecutionEtl).filter(ExecutionEtl.run_id == self.run_id).update(
+                {'statut': statut, 'date_fin': datetime.now()}
+            )
             session.commit()
-            self.logger.info(f"Statistiques chargées avec succès")
-            
         except SQLAlchemyError as e:
             session.rollback()
+            self.logger.error(f"Erreur lors de la clôture de l'exécution {self.run_id}: {str(e)}")
+        finally:
+            session.close()
+            self.run_id = None
+            self.partitions_chargees = set()
+
+    def partition_range(self, stats_list):
+        """Plage de dates (début, fin) d'une partition de statistiques"""
+        dates = [stat['date'] for stat in stats_list]
+        return pd.Timestamp(min(dates)).date(), pd.Timestamp(max(dates)).date()
+
+    def record_range(self, id_epidemie, date_debut, date_fin):
+        """Étend la plage de dates écrite pour une épidémie"""
+        if id_epidemie in self.plages_modifiees:
+            debut, fin = self.plages_modifiees[id_epidemie]
+            date_debut, date_fin = min(debut, date_debut), max(fin, date_fin)
+        self.plages_modifiees[id_epidemie] = (date_debut, date_fin)
+
+    def pending_rollups(self, plages):
+        """Lignes du journal aux agrégats non recalculés dont les écritures sont couvertes par les plages {id_epidemie: (début, fin)}"""
+        session = self.db_manager.get_session()
+        try:
+            lignes = session.query(
+                JournalChargement.id_journal, JournalChargement.run_id, JournalChargement.id_epidemie,
+                JournalChargement.date_debut, JournalChargement.date_fin
+            ).filter(JournalChargement.agregats_a_jour.isnot(True)).all()
+        finally:
+            session.close()
+
+        ids_journal = []
+        for id_journal, run_id, id_epidemie, date_debut, date_fin in lignes:
+            if id_epidemie not in plages:
+                continue
+            debut, fin = plages[id_epidemie]
+            # Partition de l'exécution en cours : sa plage a été enregistrée avant l'écriture, ou reprise du journal
+            # Partition d'une autre exécution : sa plage journalisée doit être couverte
+            if (run_id == self.run_id and self.run_id is not None) or (debut <= date_debut and date_fin <= fin):
+                ids_journal.append(id_journal)
+        return ids_journal
+
+    def mark_rollups_refreshed(self, ids_journal):
+        """Marque les agrégats de ces lignes du journal comme recalculés"""
+        if not ids_journal:
+            return
+        session = self.db_manager.get_session()
+        try:
+            session.query(JournalChargement).filter(JournalChargement.id_journal.in_(ids_journal)).update(
+                {'agregats_a_jour': True}, synchronize_session=False
+            )
+            session.commit()
+        except SQLAlchemyError as e:
+            # Sans marque, les plages seront recalculées une fois de plus : aucune perte
+            session.rollback()
+            self.logger.error(f"Erreur lors du marquage des agrégats recalculés: {str(e)}")
+        finally:
+            session.close()
+
+    def invalidate_queries(self, stats_par_epidemie):
+        """Invalide les lectures en cache des épidémies dont les statistiques viennent d'être validées"""
+        self.queries.invalidate({
+            id_epidemie: (self.maladies_epidemies.get(id_epidemie), *self.partition_range(stats_list))
+            for id_epidemie, stats_list in stats_par_epidemie.items() if stats_list
+        })
+
+    def journal_rows(self, stats_par_epidemie):
+        """Lignes du journal des partitions chargées, une par épidémie (aucune hors exécution journalisée)"""
+        if self.run_id is None:
+            return []
+        # Plage de la partition entière, comparée telle quelle par une reprise, même si seule
+        # une partie de ses lignes a changé
+        return [(self.run_id, id_epidemie,
+                 *self.plages_partitions.get(id_epidemie, self.partition_range(stats_list)), len(stats_list))
+                for id_epidemie, stats_list in stats_par_epidemie.items() if stats_list]
+
+    def select_partitions(self, partitions):
+        """Écarte les partitions (clé, id_epidemie, statistiques) déjà chargées par l'exécution reprise, puis leurs lignes inchangées"""
+        # Reprise : les partitions validées par l'exécution reprise ne sont pas rechargées
+        if self.partitions_chargees:
+            restantes = [partition for partition in partitions
+                         if (partition[1], *self.partition_range(partition[2])) not in self.partitions_chargees]
+            self.logger.info(f"Reprise : {len(partitions) - len(restantes)} partitions déjà chargées ignorées")
+            partitions = restantes
+
+        self.plages_partitions = {id_epidemie: self.partition_range(stats_list)
+                                  for _, id_epidemie, stats_list in partitions if stats_list}
+
+        # Seules les lignes nouvelles ou modifiées depuis le dernier chargement sont écrites
+        with self.metrics.stage('detection_changements', sum(len(partition[2]) for partition in partitions)) as mesure:
+            modifiees = self.select_changed({id_epidemie: stats_list for _, id_epidemie, stats_list in partitions})
+            mesure.lignes_sortie = sum(len(stats_list) for stats_list in modifiees.values())
+        return [(key, id_epidemie, modifiees[id_epidemie])
+                for key, id_epidemie, _ in partitions if modifiees[id_epidemie]]
+
+    def select_changed(self, stats_par_epidemie):
+        """Ne conserve que les statistiques nouvelles ou modifiées, d'après les empreintes déjà stockées"""
+        plages = [(id_epidemie, *self.partition_range(stats_list))
+                  for id_epidemie, stats_list in stats_par_epidemie.items() if stats_list]
+        if not plages:
+            return stats_par_epidemie
+
+        # Une seule requête pour toutes les épidémies du chargement
+        session = self.db_manager.get_session()
+        try:
+            ids, debuts, fins = map(list, zip(*plages))
+            existantes = {
+                (id_epidemie, pd.Timestamp(date_observation)): hash_contenu
+                for id_epidemie, date_observation, hash_contenu in session.execute(
+                    EMPREINTES_SQL, {'ids': ids, 'debuts': debuts, 'fins': fins}
+                )
+            }
+        finally:
+            session.close()
+        if not existantes:
+            return stats_par_epidemie
+
+        modifiees = {}
+        for id_epidemie, stats_list in stats_par_epidemie.items():
+            modifiees[id_epidemie] = [
+                stat for stat in stats_list
+                if stat.get('hash_contenu') is None
+                or existantes.get((id_epidemie, pd.Timestamp(stat['date']))) != stat['hash_contenu']
+            ]
+        nb_total = sum(len(stats_list) for stats_list in stats_par_epidemie.values())
+        nb_modifiees = sum(len(stats_list) for stats_list in modifiees.values())
+        self.logger.info(f"Détection des changements : {nb_modifiees} lignes nouvelles ou modifiées, "
+                         f"{nb_total - nb_modifiees} inchangées ignorées")
+        return modifiees
+
+    def checkpoint_groups(self, stats_par_epidemie):
+        """Regroupe les épidémies en transactions d'environ checkpoint_rows lignes"""
+        groupe, nb_lignes = {}, 0
+        for id_epidemie, stats_list in stats_par_epidemie.items():
+            groupe[id_epidemie] = stats_list
+            nb_lignes += len(stats_list)
+            if nb_lignes >= LOAD_CONFIG['checkpoint_rows']:
+                yield groupe
+                groupe, nb_lignes = {}, 0
+        if groupe:
+            yield groupe
+
+    def load_statistiques(self, stats_data, id_epidemie):
+        """Charge les statistiques quotidiennes et détaillées (upsert par lots) ; retourne le nombre de lignes rejetées"""
+        # Dédoublonnage par date : la dernière observation l'emporte
+        stats_par_date = {pd.Timestamp(stat['date']): stat for stat in stats_data}
+
+        stmt = insert(StatistiquesQuotidiennes)
+        upsert_quotidiennes = stmt.on_conflict_do_update(
+            index_elements=[StatistiquesQuotidiennes.id_epidemie, StatistiquesQuotidiennes.date_observation],
+            set_={col: stmt.excluded[col] for col in COLONNES_QUOTIDIENNES + ['hash_contenu']},
+            # Ligne inchangée : aucune réécriture
+            where=stmt.excluded.hash_contenu.is_(None)
+            | StatistiquesQuotidiennes.hash_contenu.is_distinct_from(stmt.excluded.hash_contenu)
+        ).returning(StatistiquesQuotidiennes.id_stat, StatistiquesQuotidiennes.date_observation)
+        stmt = insert(StatistiquesDetaillees)
+        upsert_detaillees = stmt.on_conflict_do_update(
+            index_elements=[StatistiquesDetaillees.id_stat],
+            set_={col: stmt.excluded[col] for col in COLONNES_DETAILLEES}
+        )
+
+        def charger_lot(session, lot):
+            resultat = session.execute(upsert_quotidiennes, [{
+                'id_epidemie': id_epidemie,
+                'date_observation': date.date(),
+                'cas_total': stat['cas_total'],
+                'deces_total': stat['deces_total'],
+                'nouveaux_cas': stat['nouveaux_cas'],
+                'nouveaux_deces': stat['nouveaux_deces'],
+                'cas_actifs': stat.get('cas_actifs', 0),
+                'cas_gueris': stat.get('cas_gueris', 0),
+                'hash_contenu': stat.get('hash_contenu')
+            } for date, stat in lot])
+            ids_stat = {pd.Timestamp(date): id_stat for id_stat, date in resultat}
+            if not ids_stat:
+                return
+
+            # Stats détaillées, rattachées via l'id_stat renvoyé par l'upsert (lignes modifiées seulement)
+            session.execute(upsert_detaillees, [{
+                'id_stat': ids_stat[date],
+                'cas_par_million': stat.get('cas_par_million', 0),
+                'deces_par_million': stat.get('deces_par_million', 0),
+                'moyenne_mobile_cas': stat.get('moyenne_mobile_cas', 0),
+                'moyenne_mobile_deces': stat.get('moyenne_mobile_deces', 0)
+            } for date, stat in lot if date in ids_stat])
+
+        try:
+            # Transaction bornée à commit_interval lots : mémoire et verrous ne dépendent plus de la taille du pays
+            with UnitOfWork(self.db_manager, self.commit_interval, on_commit=lambda lignes: self.invalidate_queries(
+                {id_epidemie: [stat for _, stat in lignes]}
+            )) as uow:
+                for lot in self._lots(list(stats_par_date.items())):
+                    uow.execute_batch(charger_lot, lot)
+
+                if uow.elements_rejetes:
+                    # Partition incomplète : non journalisée, l'exécution est close en 'partiel' et
+                    # une reprise (--resume) la recharge ; les lignes déjà validées y sont ignorées (empreintes)
+                    self.logger.warning(f"Épidémie {id_epidemie} : {uow.elements_rejetes} lignes rejetées "
+                                        f"({uow.lots_rejetes} lots annulés)")
+                else:
+                    # Journal de la partition, validé avec son dernier lot
+                    journal = self.journal_rows({id_epidemie: stats_data})
+                    if journal:
+                        uow.session.execute(insert(JournalChargement).values([
+                            dict(zip(('run_id', 'id_epidemie', 'date_debut', 'date_fin', 'nb_lignes'), ligne))
+                            for ligne in journal
+                        ]).on_conflict_do_nothing(constraint='uq_journal_chargement_partition'))
+
+            self.logger.info(f"Statistiques chargées avec succès : {len(stats_par_date) - uow.elements_rejetes} lignes")
+            return uow.elements_rejetes
+
+        except SQLAlchemyError as e:
             self.logger.error(f"Erreur lors du chargement des statistiques: {str(e)}")
             raise
 
+    def _format_valeur(self, valeur):
+        """Formate une valeur pour le flux CSV de COPY (vide = NULL)"""
+        if valeur is None or pd.isna(valeur):
+            return ''
+        return valeur
+
+    def _format_date(self, valeur):
+        """Formate une date au format ISO attendu par PostgreSQL"""
+        return pd.Timestamp(valeur).strftime('%Y-%m-%d')
+
+    def build_copy_buffer(self, stats_par_epidemie):
+        """Construit le flux CSV des statistiques à transmettre à COPY"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        nb_lignes = 0
+        for id_epidemie, stats_data in stats_par_epidemie.items():
+            for stat in stats_data:
+                writer.writerow([
+                    id_epidemie,
+                    self._format_date(stat['date']),
+                    self._format_valeur(stat['cas_total']),
+                    self._format_valeur(stat['deces_total']),
+                    self._format_valeur(stat['nouveaux_cas']),
+                    self._format_valeur(stat['nouveaux_deces']),
+                    self._format_valeur(stat.get('cas_actifs', 0)),
+                    self._format_valeur(stat.get('cas_gueris', 0)),
+                    self._format_valeur(stat.get('cas_par_million', 0)),
+                    self._format_valeur(stat.get('deces_par_million', 0)),
+                    self._format_valeur(stat.get('moyenne_mobile_cas', 0)),
+                    self._format_valeur(stat.get('moyenne_mobile_deces', 0)),
+                    self._format_valeur(stat.get('hash_contenu'))
+                ])
+                nb_lignes += 1
+        buffer.seek(0)
+        return buffer, nb_lignes
+
+    def load_statistiques_bulk(self, stats_par_epidemie):
+        """Charge en masse les statistiques via COPY FROM STDIN puis une fusion ensembliste"""
+        buffer, nb_lignes = self.build_copy_buffer(stats_par_epidemie)
+        if nb_lignes == 0:
+            return 0
+
+        # Connexion psycopg2 du pool : COPY n'est pas exposé par l'ORM
+        connection = self.db_manager.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(CREATE_STAGING_SQL)
+            cursor.copy_expert(COPY_STAGING_SQL, buffer)
+            cursor.execute(MERGE_STAGING_SQL)
+            nb_fusionnees = cursor.rowcount
+            self.metrics.record_statements(3)  # Curseur brut : invisible des événements SQLAlchemy
+
+            # Journal des partitions, validé dans la même transaction que leurs statistiques
+            journal = self.journal_rows(stats_par_epidemie)
+            if journal:
+                execute_values(cursor, JOURNAL_SQL, journal)
+                self.metrics.record_statements()
+            connection.commit()
+            cursor.close()
+            self.invalidate_queries(stats_par_epidemie)
+            self.logger.info(f"Statistiques chargées en masse : {nb_lignes} lignes transmises, {nb_fusionnees} fusionnées")
+            return nb_fusionnees
+        except Exception as e:
+            connection.rollback()
+            self.logger.error(f"Erreur lors du chargement en masse des statistiques: {str(e)}")
+            raise
+        finally:
+            connection.close()  # Rend la connexion au pool
+
+    def load_partition(self, key, id_epidemie, stats_list):
+        """Charge une partition sur sa propre connexion du pool, avec nouvelles tentatives"""
+        rapport = {'cle': key, 'id_epidemie': id_epidemie, 'lignes': len(stats_list),
+                   'tentatives': 0, 'statut': 'ok', 'erreur': None, 'lignes_rejetees': 0}
+        debut = time.perf_counter()
+
+        while True:
+            rapport['tentatives'] += 1
+            try:
+                # Une connexion et une transaction par partition
+                if self.mode == 'copy':
+                    self.load_statistiques_bulk({id_epidemie: stats_list})
+                else:
+                    rejetees = self.load_statistiques(stats_list, id_epidemie)
+                    if rejetees:
+                        # Erreur de données : une nouvelle tentative échouerait de même, la partition
+                        # (non journalisée) est en échec et sera rechargée par une reprise
+                        rapport.update(statut='echec', erreur=f"{rejetees} lignes rejetées", lignes_rejetees=rejetees)
+                break
+            except ERREURS_TRANSITOIRES as e:
+                if rapport['tentatives'] > LOAD_CONFIG['retries']:
+                    rapport.update(statut='echec', erreur=str(e))
+                    break
+                delai = LOAD_CONFIG['retry_delay'] * 2 ** (rapport['tentatives'] - 1)
+                self.logger.warning(f"Erreur transitoire sur la partition {key}, nouvelle tentative dans {delai:.1f} s : {str(e)}")
+                time.sleep(delai)
+            except Exception as e:
+                rapport.update(statut='echec', erreur=str(e))
+                break
+
+        rapport['duree'] = round(time.perf_counter() - debut, 3)
+        return rapport
+
+    def load_statistiques_parallel(self, partitions):
+        """Charge les partitions (clé, id_epidemie, statistiques) en parallèle sur un pool de threads borné"""
+        # Pas plus de threads que de connexions disponibles dans le pool
+        pool_size = self.db_manager.engine.pool.size() if hasattr(self.db_manager.engine.pool, 'size') else self.workers
+        workers = max(1, min(self.workers, pool_size, len(partitions)))
+        self.logger.info(f"Chargement parallèle de {len(partitions)} partitions sur {workers} connexions")
+
+        rapports = []
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self.load_partition, key, id_epidemie, stats_list)
+                       for key, id_epidemie, stats_list in partitions]
+            for future in as_completed(futures):
+                rapport = future.result()
+                if rapport['statut'] != 'ok':
+                    self.logger.error(f"Échec de la partition {rapport['cle']} après {rapport['tentatives']} tentative(s): {rapport['erreur']}")
+                rapports.append(rapport)
+
+        echecs = sum(1 for rapport in rapports if rapport['statut'] != 'ok')
+        self.logger.info(f"Chargement parallèle terminé : {len(rapports) - echecs} partitions chargées, {echecs} en échec")
+        return rapports
+
+    def get_watermarks(self):
+        """Dernière date chargée de chaque épidémie, par préfixe de maladie puis par pays"""
+        session = self.db_manager.get_session()
+        try:
+            resultats = session.query(
+                EpidemiePays.id_maladie,
+                Pays.nom_pays,
+                func.max(StatistiquesQuotidiennes.date_observation)
+            ).join(Pays, Pays.id_pays == EpidemiePays.id_pays
+            ).join(StatistiquesQuotidiennes, StatistiquesQuotidiennes.id_epidemie == EpidemiePays.id_epidemie
+            ).group_by(EpidemiePays.id_maladie, Pays.nom_pays).all()
+
+            watermarks = {prefixe: {} for prefixe in PREFIXES_MALADIES.values()}
+            for id_maladie, nom_pays, date_max in resultats:
+                if id_maladie in PREFIXES_MALADIES:
+                    watermarks[PREFIXES_MALADIES[id_maladie]][nom_pays] = pd.Timestamp(date_max)
+            return watermarks
+        except SQLAlchemyError as e:
+            self.logger.error(f"Erreur lors de la lecture des dernières dates chargées: {str(e)}")
+            raise
+        finally:
+            session.close()
+
     def load(self, transformed_data):
         """Méthode principale de chargement"""
         try:
             # Chargement des pays
-            self.load_pays(transformed_data['pays'])
+            with self.metrics.stage('load_pays', len(transformed_data['pays'])):
+                self.load_pays(transformed_data['pays'])
             
+            # Résolution des pays : ceux créés par load_pays sont connus du resolver
+            epidemie_data = []
+            pays_inconnus = []
+            for epidemie in transformed_data['epidemie']:
+                pays_id = epidemie.get('id_pays') or self.resolver.get_pays_id(epidemie['nom_pays'])
+                if pays_id:
+                    epidemie_data.append({**epidemie, 'id_pays': pays_id})
+                else:
+                    pays_inconnus.append(epidemie['nom_pays'])
+            if pays_inconnus:
+                self.logger.warning(f"{len(pays_inconnus)} épidémies ignorées, pays inconnus : {pays_inconnus[:10]}")
+
             # Chargement des épidémies et récupération des IDs
+            with self.metrics.stage('load_epidemie', len(epidemie_data)):
+                self.load_epidemie(epidemie_data)
             epidemies = {}
-            for epidemie in transformed_data['epidemie']:
-                pays_id = epidemie['id_pays']
-                maladie_id = epidemie['id_maladie']
-                session = self.db_manager.get_session()
-                
-                existante = session.query(EpidemiePays).filter_by(
-                    id_pays=pays_id,
-                    id_maladie=maladie_id
-                ).first()
-                
-                if existante:
-                    # Si l'épidémie existe, utiliser son ID
-                    key = f"{'covid' if maladie_id == 1 else 'mpox'}_{epidemie['nom_pays']}"
-                    epidemies[key] = existante.id_epidemie
-                
-                session.close()
-            
+            for epidemie in epidemie_data:
+                key = f"{PREFIXES_MALADIES[epidemie['id_maladie']]}_{epidemie['nom_pays']}"
+                epidemies[key] = self.resolver.get_epidemie_id(epidemie['id_pays'], epidemie['id_maladie'])
+                self.maladies_epidemies[epidemies[key]] = epidemie['id_maladie']
+
             # Chargement des statistiques avec les IDs corrects
+            partitions = []
+            cles_inconnues = []
             for key, stats_list in transformed_data['statistiques'].items():
                 if key in epidemies:
-                    self.load_statistiques(stats_list, epidemies[key])
+                    partitions.append((key, epidemies[key], stats_list))
                 else:
-                    self.logger.warning(f"Pas d'ID d'épidémie trouvé pour la clé {key}")
-            
+                    cles_inconnues.append(key)
+            if cles_inconnues:
+                self.logger.warning(f"Pas d'ID d'épidémie trouvé pour {len(cles_inconnues)} clés : {cles_inconnues[:10]}")
+
+            partitions = self.select_partitions(partitions)
+            stats_par_epidemie = {id_epidemie: stats_list for _, id_epidemie, stats_list in partitions}
+
+            # Plages enregistrées avant l'écriture : si le chargement échoue, les agrégats des lots
+            # déjà validés sont tout de même recalculés
+            for id_epidemie, stats_list in stats_par_epidemie.items():
+                self.record_range(id_epidemie, *self.partition_range(stats_list))
+
+            nb_lignes = sum(len(stats_list) for stats_list in stats_par_epidemie.values())
+            with self.metrics.stage('load_statistiques', nb_lignes) as mesure:
+                if self.workers > 1:
+                    rapports = self.load_statistiques_parallel(partitions)
+                    # Partitions aux lignes rejetées : leurs autres lots sont validés, l'exécution sera partielle
+                    self.lignes_rejetees += sum(rapport['lignes_rejetees'] for rapport in rapports)
+                    nb_lignes -= sum(rapport['lignes_rejetees'] for rapport in rapports)
+                    echecs = [rapport for rapport in rapports if rapport['statut'] != 'ok' and not rapport['lignes_rejetees']]
+                    if echecs:
+                        # Les partitions validées gardent leurs plages (enregistrées avant l'écriture) :
+                        # leurs agrégats sont recalculés malgré l'échec
+                        self.logger.error(f"{len(echecs)} partitions en échec : " + ", ".join(
+                            f"{rapport['cle']} ({rapport['erreur']})" for rapport in echecs[:10]
+                        ))
+                        return False
+                elif self.mode == 'copy':
+                    # Une transaction journalisée par groupe : un échec ne perd que le groupe en cours
+                    for groupe in self.checkpoint_groups(stats_par_epidemie):
+                        self.load_statistiques_bulk(groupe)
+                else:
+                    rejetees = sum(self.load_statistiques(stats_list, id_epidemie)
+                                   for id_epidemie, stats_list in stats_par_epidemie.items())
+                    if rejetees:
+                        self.logger.error(f"{rejetees} lignes statistiques rejetées, leurs lots ont été annulés")
+                    self.lignes_rejetees += rejetees
+                    nb_lignes -= rejetees
+                mesure.lignes_sortie = nb_lignes
+
             return True
         except Exception as e:
             self.logger.error(f"Erreur lors du chargement: {str(e)}")
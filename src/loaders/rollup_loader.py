@@ -0,0 +1,105 @@
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from .base_loader import BaseLoader
+
+# Granularités des agrégats périodiques : nom stocké -> unité de date_trunc
+GRANULARITES = {'semaine': 'week', 'mois': 'month'}
+
+# Région des pays sans région OMS connue (la région fait partie de la clé des agrégats régionaux)
+REGION_INCONNUE = 'Non renseignée'
+
+# Plages touchées par le chargement, une ligne par épidémie
+PLAGES_CTE = "unnest(:ids, :debuts, :fins) AS r(id_epidemie, date_debut, date_fin)"
+
+# Périodes entières contenant les dates chargées : une semaine ou un mois touché est recalculé en entier
+PERIODIQUES_SQL = text(f"""
+    WITH plages AS (
+        SELECT r.id_epidemie,
+               date_trunc(:unite, r.date_debut)::date AS debut,
+               (date_trunc(:unite, r.date_fin) + CAST('1 ' || :unite AS interval))::date AS fin
+        FROM {PLAGES_CTE}
+    )
+    INSERT INTO statistiques_periodiques (
+        id_epidemie, granularite, debut_periode, nouveaux_cas, nouveaux_deces, cas_total, deces_total, nb_jours
+    )
+    SELECT q.id_epidemie, :granularite, date_trunc(:unite, q.date_observation)::date,
+           SUM(q.nouveaux_cas), SUM(q.nouveaux_deces),
+           (array_agg(q.cas_total ORDER BY q.date_observation DESC))[1],
+           (array_agg(q.deces_total ORDER BY q.date_observation DESC))[1],
+           COUNT(*)
+    FROM plages p
+    JOIN statistiques_quotidiennes q
+      ON q.id_epidemie = p.id_epidemie AND q.date_observation >= p.debut AND q.date_observation < p.fin
+    GROUP BY q.id_epidemie, date_trunc(:unite, q.date_observation)
+    ON CONFLICT (id_epidemie, granularite, debut_periode) DO UPDATE SET
+        nouveaux_cas = EXCLUDED.nouveaux_cas,
+        nouveaux_deces = EXCLUDED.nouveaux_deces,
+        cas_total = EXCLUDED.cas_total,
+        deces_total = EXCLUDED.deces_total,
+        nb_jours = EXCLUDED.nb_jours
+""")
+
+# Jours touchés par maladie et région : tous les pays de la région sont ré-agrégés sur ces jours
+REGIONALES_SQL = text(f"""
+    WITH plages AS (
+        SELECT e.id_maladie, COALESCE(p.region_oms, :region_inconnue) AS region_oms,
+               MIN(r.date_debut) AS debut, MAX(r.date_fin) AS fin
+        FROM {PLAGES_CTE}
+        JOIN epidemie_pays e ON e.id_epidemie = r.id_epidemie
+        JOIN pays p ON p.id_pays = e.id_pays
+        GROUP BY e.id_maladie, COALESCE(p.region_oms, :region_inconnue)
+    )
+    INSERT INTO statistiques_regionales (
+        id_maladie, region_oms, date_observation, nouveaux_cas, nouveaux_deces, cas_total, deces_total, nb_pays
+    )
+    SELECT pl.id_maladie, pl.region_oms, q.date_observation,
+           SUM(q.nouveaux_cas), SUM(q.nouveaux_deces), SUM(q.cas_total), SUM(q.deces_total), COUNT(*)
+    FROM plages pl
+    JOIN epidemie_pays e ON e.id_maladie = pl.id_maladie
+    JOIN pays p ON p.id_pays = e.id_pays AND COALESCE(p.region_oms, :region_inconnue) = pl.region_oms
+    JOIN statistiques_quotidiennes q
+      ON q.id_epidemie = e.id_epidemie AND q.date_observation BETWEEN pl.debut AND pl.fin
+    GROUP BY pl.id_maladie, pl.region_oms, q.date_observation
+    ON CONFLICT (id_maladie, region_oms, date_observation) DO UPDATE SET
+        nouveaux_cas = EXCLUDED.nouveaux_cas,
+        nouveaux_deces = EXCLUDED.nouveaux_deces,
+        cas_total = EXCLUDED.cas_total,
+        deces_total = EXCLUDED.deces_total,
+        nb_pays = EXCLUDED.nb_pays
+""")
+
+class RollupLoader(BaseLoader):
+    """Agrégats hebdomadaires, mensuels et régionaux, recalculés sur les seules périodes touchées"""
+
+    def load(self, plages):
+        """Recalcule les agrégats des plages {id_epidemie: (date_debut, date_fin)} chargées"""
+        plages = {id_epidemie: plage for id_epidemie, plage in plages.items() if plage}
+        if not plages:
+            self.logger.info("Agrégats : aucune période à recalculer")
+            return True
+
+        ids = list(plages)
+        parametres = {
+            'ids': ids,
+            'debuts': [plages[id_epidemie][0] for id_epidemie in ids],
+            'fins': [plages[id_epidemie][1] for id_epidemie in ids]
+        }
+        session = self.db_manager.get_session()
+        try:
+            # Une transaction : les tableaux de bord ne voient jamais des agrégats à moitié recalculés
+            nb_periodes = 0
+            for granularite, unite in GRANULARITES.items():
+                nb_periodes += session.execute(
+                    PERIODIQUES_SQL, {**parametres, 'granularite': granularite, 'unite': unite}
+                ).rowcount
+            nb_jours = session.execute(REGIONALES_SQL, {**parametres, 'region_inconnue': REGION_INCONNUE}).rowcount
+            session.commit()
+            self.logger.info(f"Agrégats recalculés pour {len(plages)} épidémies : "
+                             f"{nb_periodes} périodes, {nb_jours} jours régionaux")
+            return True
+        except SQLAlchemyError as e:
+            session.rollback()
+            self.logger.error(f"Erreur lors du calcul des agrégats: {str(e)}")
+            raise
+        finally:
+            session.close()
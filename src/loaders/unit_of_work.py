@@ -0,0 +1,62 @@
+from sqlalchemy.exc import DataError, IntegrityError
+from src.config.config import LOAD_CONFIG
+from src.utils.logger import setup_logger
+
+logger = setup_logger('loaders')
+
+# Erreurs propres aux données d'un lot : seul ce lot est annulé, le chargement continue
+ERREURS_DONNEES = (DataError, IntegrityError)
+
+class UnitOfWork:
+    """Session découpée en lots : un savepoint par lot, une validation tous les commit_interval lots"""
+
+    def __init__(self, db_manager, commit_interval=None, on_commit=None):
+        self.db_manager = db_manager
+        self.commit_interval = commit_interval or LOAD_CONFIG['commit_interval']
+        self.on_commit = on_commit  # Appelé avec les éléments des lots qui viennent d'être validés
+        self.session = None
+        self.lots_valides = 0
+        self.lots_rejetes = 0
+        self.elements_rejetes = 0
+        self._lots_en_attente = 0
+        self._elements_en_attente = []
+
+    def __enter__(self):
+        self.session = self.db_manager.get_session()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.commit()
+            else:
+                self.session.rollback()
+        finally:
+            self.session.close()  # La connexion est toujours rendue au pool
+        return False
+
+    def execute_batch(self, fonction, lot):
+        """Exécute fonction(session, lot) dans un savepoint ; retourne False si le lot a été annulé"""
+        try:
+            with self.session.begin_nested():
+                fonction(self.session, lot)
+        except ERREURS_DONNEES as e:
+            # Savepoint annulé : les lots précédents de la transaction sont conservés
+            self.lots_rejetes += 1
+            self.elements_rejetes += len(lot)
+            logger.error(f"Lot de {len(lot)} lignes annulé : {str(getattr(e, 'orig', e)).strip()}")
+            return False
+
+        self._lots_en_attente += 1
+        self._elements_en_attente.extend(lot)
+        if self._lots_en_attente >= self.commit_interval:
+            self.commit()
+        return True
+
+    def commit(self):
+        """Valide les lots en attente"""
+        self.session.commit()
+        self.lots_valides += self._lots_en_attente
+        elements, self._elements_en_attente, self._lots_en_attente = self._elements_en_attente, [], 0
+        if self.on_commit and elements:
+            self.on_commit(elements)
@@ -3,7 +3,11 @@ from .models import (
     Maladie,
     EpidemiePays,
     StatistiquesQuotidiennes,
-    StatistiquesDetaillees
+    StatistiquesDetaillees,
+    ExecutionEtl,
+    JournalChargement,
+    StatistiquesPeriodiques,
+    StatistiquesRegionales
 )
 
 __all__ = [
@@ -11,5 +15,9 @@ __all__ = [
     'Maladie',
     'EpidemiePays',
     'StatistiquesQuotidiennes',
-    'StatistiquesDetaillees'
+    'StatistiquesDetaillees',
+    'ExecutionEtl',
+    'JournalChargement',
+    'StatistiquesPeriodiques',
+    'StatistiquesRegionales'
 ]
\ No newline at end of file
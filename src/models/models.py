@@ -1,5 +1,5 @@
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, Text, TIMESTAMP
+from sqlalchemy import Column, Integer, BigInteger, Boolean, String, Float, Date, ForeignKey, Text, TIMESTAMP, UniqueConstraint, Index, func, false
 from sqlalchemy.orm import relationship
 
 Base = declarative_base()
@@ -12,6 +12,7 @@ class Pays(Base):
    nom_pays = Column(String(100), nullable=False, unique=True)
    code_iso = Column(String(3), unique=True)
    region_oms = Column(String(50))
+   population = Column(BigInteger)
 
    # Relation avec epidemie_pays
    epidemies = relationship("EpidemiePays", back_populates="pays")
@@ -32,7 +33,11 @@ class Maladie(Base):
 
 class EpidemiePays(Base):
    __tablename__ = 'epidemie_pays'
-   __table_args__ = {'extend_existing': True}
+   __table_args__ = (
+      UniqueConstraint('id_pays', 'id_maladie', name='uq_epidemie_pays_pays_maladie'),
+      Index('ix_epidemie_pays_maladie', 'id_maladie'),
+      {'extend_existing': True}
+   )
    
    id_epidemie = Column(Integer, primary_key=True)
    date_premier_cas = Column(Date, nullable=False)
@@ -49,7 +54,13 @@ class EpidemiePays(Base):
 
 class StatistiquesQuotidiennes(Base):
    __tablename__ = 'statistiques_quotidiennes'
-   __table_args__ = {'extend_existing': True}
+   __table_args__ = (
+      # L'index unique (id_epidemie, date_observation) sert aussi aux séries temporelles d'une épidémie
+      UniqueConstraint('id_epidemie', 'date_observation', name='uq_statistiques_quotidiennes_epidemie_date'),
+      # Fenêtres de dates toutes épidémies confondues (agrégats, rollups)
+      Index('ix_statistiques_quotidiennes_date', 'date_observation'),
+      {'extend_existing': True}
+   )
    
    id_stat = Column(Integer, primary_key=True)
    date_observation = Column(Date, nullable=False)
@@ -59,6 +70,7 @@ class StatistiquesQuotidiennes(Base):
    nouveaux_deces = Column(Integer, default=0)
    cas_actifs = Column(Integer, default=0)
    cas_gueris = Column(Integer, default=0)
+   hash_contenu = Column(BigInteger)  # Empreinte des valeurs quotidiennes et détaillées (détection des changements)
    id_epidemie = Column(Integer, ForeignKey('epidemie_pays.id_epidemie'), nullable=False)
 
    # Relations
@@ -77,4 +89,64 @@ class StatistiquesDetaillees(Base):
    id_stat = Column(Integer, ForeignKey('statistiques_quotidiennes.id_stat'), nullable=False, unique=True)
 
    # Relation
-   stat_quotidienne = relationship("StatistiquesQuotidiennes", back_populates="stats_detaillees")
\ No newline at end of file
+   stat_quotidienne = relationship("StatistiquesQuotidiennes", back_populates="stats_detaillees")
+
+class ExecutionEtl(Base):
+   __tablename__ = 'execution_etl'
+   __table_args__ = {'extend_existing': True}
+
+   run_id = Column(String(32), primary_key=True)
+   date_debut = Column(TIMESTAMP, nullable=False, server_default=func.now())
+   date_fin = Column(TIMESTAMP)
+   statut = Column(String(20), nullable=False)  # en_cours, succes, partiel (lignes rejetées), echec
+
+   # Relation avec le journal des partitions
+   partitions = relationship("JournalChargement", back_populates="execution")
+
+class JournalChargement(Base):
+   __tablename__ = 'journal_chargement'
+   __table_args__ = (
+      UniqueConstraint('run_id', 'id_epidemie', 'date_debut', 'date_fin', name='uq_journal_chargement_partition'),
+      {'extend_existing': True}
+   )
+
+   id_journal = Column(Integer, primary_key=True)
+   run_id = Column(String(32), ForeignKey('execution_etl.run_id'), nullable=False)
+   id_epidemie = Column(Integer, ForeignKey('epidemie_pays.id_epidemie'), nullable=False)
+   date_debut = Column(Date, nullable=False)
+   date_fin = Column(Date, nullable=False)
+   nb_lignes = Column(Integer, nullable=False)
+   date_chargement = Column(TIMESTAMP, nullable=False, server_default=func.now())
+   # Agrégats recalculés sur la plage de la partition : tant que ce n'est pas le cas, chaque exécution la reprend
+   agregats_a_jour = Column(Boolean, nullable=False, server_default=false())
+
+   # Relation
+   execution = relationship("ExecutionEtl", back_populates="partitions")
+
+class StatistiquesPeriodiques(Base):
+   __tablename__ = 'statistiques_periodiques'
+   __table_args__ = {'extend_existing': True}
+
+   # Agrégats d'une épidémie par semaine ou par mois, recalculés après chaque chargement
+   id_epidemie = Column(Integer, ForeignKey('epidemie_pays.id_epidemie'), primary_key=True)
+   granularite = Column(String(10), primary_key=True)  # semaine, mois
+   debut_periode = Column(Date, primary_key=True)
+   nouveaux_cas = Column(BigInteger, nullable=False)
+   nouveaux_deces = Column(BigInteger, nullable=False)
+   cas_total = Column(Integer)  # Cumul au dernier jour observé de la période
+   deces_total = Column(Integer)
+   nb_jours = Column(Integer, nullable=False)
+
+class StatistiquesRegionales(Base):
+   __tablename__ = 'statistiques_regionales'
+   __table_args__ = {'extend_existing': True}
+
+   # Agrégats quotidiens d'une maladie par région OMS, recalculés après chaque chargement
+   id_maladie = Column(Integer, ForeignKey('maladie.id_maladie'), primary_key=True)
+   region_oms = Column(String(50), primary_key=True)
+   date_observation = Column(Date, primary_key=True)
+   nouveaux_cas = Column(BigInteger, nullable=False)
+   nouveaux_deces = Column(BigInteger, nullable=False)
+   cas_total = Column(BigInteger, nullable=False)
+   deces_total = Column(BigInteger, nullable=False)
+   nb_pays = Column(Integer, nullable=False)
\ No newline at end of file
@@ -0,0 +1,9 @@
+from .stats_queries import StatsQueries, stats_queries, get_series, get_latest, top_n
+
+__all__ = [
+    'StatsQueries',
+    'stats_queries',
+    'get_series',
+    'get_latest',
+    'top_n'
+]
\ No newline at end of file
@@ -0,0 +1,258 @@
+import threading
+import time
+from collections import OrderedDict
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from src.config.config import QUERY_CONFIG
+from src.config.database import db_manager
+from src.utils.logger import setup_logger
+
+logger = setup_logger('queries')
+
+# Colonnes de statistiques renvoyées : quotidiennes (alias q) puis détaillées (alias d)
+COLONNES_QUOTIDIENNES = ['cas_total', 'deces_total', 'nouveaux_cas', 'nouveaux_deces', 'cas_actifs', 'cas_gueris']
+COLONNES_DETAILLEES = ['cas_par_million', 'deces_par_million', 'moyenne_mobile_cas', 'moyenne_mobile_deces']
+
+# Métriques acceptées par top_n : nom -> colonne SQL (jamais de nom de colonne venant de l'appelant)
+METRIQUES = {
+    **{colonne: f"q.{colonne}" for colonne in COLONNES_QUOTIDIENNES},
+    **{colonne: f"d.{colonne}" for colonne in COLONNES_DETAILLEES}
+}
+
+SELECT_STATISTIQUES = ", ".join(METRIQUES.values())
+
+JOINTURES = """
+    FROM statistiques_quotidiennes q
+    JOIN epidemie_pays e ON e.id_epidemie = q.id_epidemie
+    JOIN pays p ON p.id_pays = e.id_pays
+    JOIN maladie m ON m.id_maladie = e.id_maladie
+    LEFT JOIN statistiques_detaillees d ON d.id_stat = q.id_stat
+"""
+
+# Série d'un pays pour une maladie, bornes de dates facultatives
+SERIE_SQL = text(f"""
+    SELECT q.id_epidemie, e.id_maladie, q.date_observation, {SELECT_STATISTIQUES}
+    {JOINTURES}
+    WHERE p.nom_pays = :nom_pays AND m.nom_maladie = :nom_maladie
+      AND (CAST(:date_debut AS date) IS NULL OR q.date_observation >= :date_debut)
+      AND (CAST(:date_fin AS date) IS NULL OR q.date_observation <= :date_fin)
+    ORDER BY q.date_observation
+""")
+
+# Dernière observation de chaque pays pour une maladie
+DERNIERES_SQL = text(f"""
+    SELECT DISTINCT ON (q.id_epidemie)
+           q.id_epidemie, e.id_maladie, p.nom_pays, p.code_iso, p.region_oms, q.date_observation, {SELECT_STATISTIQUES}
+    {JOINTURES}
+    WHERE m.nom_maladie = :nom_maladie
+    ORDER BY q.id_epidemie, q.date_observation DESC
+""")
+
+# Pays ayant la plus forte valeur d'une métrique à une date (index sur date_observation)
+TOP_SQL = """
+    SELECT q.id_epidemie, e.id_maladie, p.nom_pays, m.nom_maladie, q.date_observation, {colonne} AS valeur
+    {jointures}
+    WHERE q.date_observation = :date_observation
+      AND (CAST(:nom_maladie AS text) IS NULL OR m.nom_maladie = :nom_maladie)
+      AND {colonne} IS NOT NULL
+    ORDER BY {colonne} DESC, p.nom_pays
+    LIMIT :n
+"""
+
+# Partitions journalisées depuis la dernière lecture, quel que soit le processus qui les a chargées
+JOURNAL_SQL = text("""
+    SELECT j.id_journal, j.id_epidemie, e.id_maladie, j.date_debut, j.date_fin
+    FROM journal_chargement j
+    JOIN epidemie_pays e ON e.id_epidemie = j.id_epidemie
+    WHERE j.id_journal > :dernier
+    ORDER BY j.id_journal
+""")
+
+DERNIER_JOURNAL_SQL = text("SELECT COALESCE(MAX(id_journal), 0) FROM journal_chargement")
+
+# Dépendance d'une série ou d'une liste vide : toute épidémie chargée peut la remplir
+TOUTES = ('toutes',)
+
+
+class StatsQueries:
+    """Lecture des statistiques chargées, derrière un cache LRU invalidé par épidémie"""
+
+    def __init__(self, db_manager, cache_size=None, ttl=None, version_interval=None):
+        self.db_manager = db_manager
+        self.cache_size = QUERY_CONFIG['cache_size'] if cache_size is None else cache_size
+        self.ttl = QUERY_CONFIG['ttl'] if ttl is None else ttl
+        self.version_interval = QUERY_CONFIG['version_interval'] if version_interval is None else version_interval
+        self._verrou = threading.Lock()
+        self._cache = OrderedDict()  # clé -> (DataFrame, dépendances, instant de mise en cache)
+        self._generation = 0         # Incrémentée à chaque invalidation
+        self._dernier_journal = None # Dernière ligne du journal de chargement prise en compte
+        self._derniere_verification = None
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+
+    def _execute(self, requete, parametres):
+        """Exécute une requête et retourne ses lignes dans un DataFrame aux types NumPy"""
+        session = self.db_manager.get_session()
+        try:
+            resultat = session.execute(requete, parametres)
+            df = pd.DataFrame.from_records(resultat.fetchall(), columns=list(resultat.keys()), coerce_float=True)
+        except SQLAlchemyError as e:
+            logger.error(f"Erreur lors de la lecture des statistiques: {str(e)}")
+            raise
+        finally:
+            session.close()
+
+        df['date_observation'] = pd.to_datetime(df['date_observation'])
+        for colonne in df.columns.intersection([*METRIQUES, 'valeur']):
+            df[colonne] = pd.to_numeric(df[colonne])
+        return df
+
+    def check_journal(self):
+        """Invalide les résultats touchés par les partitions journalisées depuis la dernière vérification"""
+        with self._verrou:
+            maintenant = time.monotonic()
+            if (self._derniere_verification is not None
+                    and maintenant - self._derniere_verification < self.version_interval):
+                return
+            # Un seul thread interroge le journal par intervalle
+            self._derniere_verification = maintenant
+            dernier = self._dernier_journal
+
+        session = self.db_manager.get_session()
+        try:
+            if dernier is None:
+                # Premier appel : le cache est vide, seul le point de départ est relevé
+                lignes, dernier = [], session.execute(DERNIER_JOURNAL_SQL).scalar()
+            else:
+                lignes = session.execute(JOURNAL_SQL, {'dernier': dernier}).fetchall()
+        except SQLAlchemyError as e:
+            # Sans journal lisible, seule l'expiration (ttl) limite l'obsolescence du cache
+            logger.warning(f"Lecture du journal de chargement impossible: {str(e)}")
+            return
+        finally:
+            session.close()
+
+        plages = {}
+        for id_journal, id_epidemie, id_maladie, date_debut, date_fin in lignes:
+            dernier = max(dernier, id_journal)
+            _, debut, fin = plages.get(id_epidemie, (id_maladie, date_debut, date_fin))
+            plages[id_epidemie] = (id_maladie, min(debut, date_debut), max(fin, date_fin))
+        with self._verrou:
+            self._dernier_journal = max(dernier, self._dernier_journal or 0)
+        # Une transaction validée après une autre de numéro supérieur peut échapper à ce relevé :
+        # l'expiration (ttl) borne alors l'obsolescence
+        self.invalidate(plages)
+
+    def _cached(self, cle, requete, parametres, dependances):
+        """Résultat en cache, ou exécuté puis mis en cache avec les dépendances qui l'invalident"""
+        if self.cache_size > 0:
+            self.check_journal()
+        with self._verrou:
+            if cle in self._cache:
+                df, _, mis_en_cache = self._cache[cle]
+                if self.ttl <= 0 or time.monotonic() - mis_en_cache < self.ttl:
+                    self._cache.move_to_end(cle)
+                    self.hits += 1
+                    return df.copy()
+                del self._cache[cle]
+                self.expirations += 1
+            self.misses += 1
+            generation = self._generation
+
+        df = self._execute(requete, parametres)
+        with self._verrou:
+            # Un chargement validé pendant la requête a pu rendre le résultat obsolète : il n'est pas conservé
+            if self.cache_size > 0 and generation == self._generation:
+                self._cache[cle] = (df, dependances(df) or {TOUTES}, time.monotonic())
+                self._cache.move_to_end(cle)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return df.copy()
+
+    def get_series(self, nom_pays, nom_maladie, date_debut=None, date_fin=None):
+        """Série quotidienne d'un pays pour une maladie, entre deux dates facultatives"""
+        date_debut = pd.Timestamp(date_debut).date() if date_debut is not None else None
+        date_fin = pd.Timestamp(date_fin).date() if date_fin is not None else None
+        return self._cached(
+            ('serie', nom_pays, nom_maladie, date_debut, date_fin), SERIE_SQL,
+            {'nom_pays': nom_pays, 'nom_maladie': nom_maladie, 'date_debut': date_debut, 'date_fin': date_fin},
+            lambda df: {('epidemie', int(id_epidemie)) for id_epidemie in df['id_epidemie'].unique()}
+        )
+
+    def get_latest(self, nom_maladie):
+        """Dernière observation de chaque pays pour une maladie"""
+        return self._cached(
+            ('dernieres', nom_maladie), DERNIERES_SQL, {'nom_maladie': nom_maladie},
+            lambda df: {('maladie', int(id_maladie)) for id_maladie in df['id_maladie'].unique()}
+        )
+
+    def top_n(self, metrique, date_observation, n=10, nom_maladie=None):
+        """Les n pays ayant la plus forte valeur d'une métrique à une date"""
+        if metrique not in METRIQUES:
+            raise ValueError(f"Métrique inconnue : {metrique} (attendu : {', '.join(METRIQUES)})")
+        date_observation = pd.Timestamp(date_observation).date()
+        return self._cached(
+            ('top', metrique, date_observation, n, nom_maladie),
+            text(TOP_SQL.format(colonne=METRIQUES[metrique], jointures=JOINTURES)),
+            {'date_observation': date_observation, 'nom_maladie': nom_maladie, 'n': n},
+            # Seul un chargement couvrant cette date peut modifier le classement
+            lambda df: {('date', date_observation)}
+        )
+
+    def invalidate(self, plages):
+        """Retire du cache les résultats touchés par les plages {id_epidemie: (id_maladie, date_debut, date_fin)} validées"""
+        if not plages:
+            return
+        epidemies = {('epidemie', id_epidemie) for id_epidemie in plages}
+        maladies = {('maladie', id_maladie) for id_maladie, _, _ in plages.values()}
+        bornes = [(pd.Timestamp(debut).date(), pd.Timestamp(fin).date()) for _, debut, fin in plages.values()]
+
+        def obsolete(dependances):
+            for dependance in dependances:
+                if dependance == TOUTES or dependance in epidemies or dependance in maladies:
+                    return True
+                if dependance[0] == 'date' and any(debut <= dependance[1] <= fin for debut, fin in bornes):
+                    return True
+            return False
+
+        with self._verrou:
+            self._generation += 1
+            cles = [cle for cle, (_, dependances, _) in self._cache.items() if obsolete(dependances)]
+            for cle in cles:
+                del self._cache[cle]
+        if cles:
+            logger.debug(f"Cache de lecture : {len(cles)} résultats invalidés")
+
+    def clear(self):
+        """Vide le cache"""
+        with self._verrou:
+            self._generation += 1
+            self._cache.clear()
+
+    def cache_info(self):
+        """Succès, échecs, expirations, taille et capacité du cache"""
+        with self._verrou:
+            return {'hits': self.hits, 'misses': self.misses, 'expirations': self.expirations,
+                    'taille': len(self._cache), 'capacite': self.cache_size, 'ttl': self.ttl}
+
+
+# Instance partagée, invalidée par PostgresLoader après chaque validation dans ce processus
+# et par le journal de chargement pour les chargements des autres processus
+stats_queries = StatsQueries(db_manager)
+
+
+def get_series(nom_pays, nom_maladie, date_debut=None, date_fin=None):
+    """Série quotidienne d'un pays pour une maladie (cache partagé)"""
+    return stats_queries.get_series(nom_pays, nom_maladie, date_debut, date_fin)
+
+
+def get_latest(nom_maladie):
+    """Dernière observation de chaque pays pour une maladie (cache partagé)"""
+    return stats_queries.get_latest(nom_maladie)
+
+
+def top_n(metrique, date_observation, n=10, nom_maladie=None):
+    """Les n pays ayant la plus forte valeur d'une métrique à une date (cache partagé)"""
+    return stats_queries.top_n(metrique, date_observation, n, nom_maladie)
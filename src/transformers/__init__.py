@@ -1,9 +1,11 @@
 from .cleaner import DataCleaner
 from .aggregator import DataAggregator
 from .normalizer import DataNormalizer
+from .incremental import IncrementalFilter
 
 __all__ = [
     'DataCleaner',
     'DataAggregator',
-    'DataNormalizer'
+    'DataNormalizer',
+    'IncrementalFilter'
 ]
\ No newline at end of file
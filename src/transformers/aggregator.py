@@ -15,20 +15,27 @@ class DataAggregator(BaseTransformer):
             non_metric_columns.append('iso_code')
 
         # Grouper par date et pays, agréger les métriques
-        aggregated = df.groupby([date_column, country_column])[metrics].sum().reset_index()
+        aggregated = df.groupby([date_column, country_column], observed=True)[metrics].sum().reset_index()
 
         # Ajouter les colonnes non-métriques (prendre la première valeur pour chaque pays)
         if non_metric_columns:
-            additional_info = df.groupby(country_column)[non_metric_columns].first().reset_index()
+            additional_info = df.groupby(country_column, observed=True)[non_metric_columns].first().reset_index()
             aggregated = aggregated.merge(additional_info, on=country_column)
 
         return aggregated
 
-    def calculate_rolling_averages(self, df, date_column, metrics, window=7):
-        """Calcul des moyennes mobiles"""
-        for metric in metrics:
-            df[f'{metric}_rolling_avg'] = df.groupby(level=0)[metric].rolling(window=window).mean()
-        return df
+    def calculate_rolling_averages(self, df, date_column, metrics, window=7, country_column=None):
+        """Calcul des moyennes mobiles par pays, en une seule passe groupée sur le DataFrame trié"""
+        if country_column is None:
+            df = df.sort_values(date_column, kind='stable')
+            moyennes = df[metrics].rolling(window=window, min_periods=1).mean()
+        else:
+            df = df.sort_values([country_column, date_column], kind='stable')
+            # Les fenêtres ne franchissent pas les frontières entre pays ; l'index d'origine est conservé
+            moyennes = (df.groupby(country_column, sort=False, observed=True)[metrics]
+                        .rolling(window=window, min_periods=1).mean()
+                        .reset_index(level=0, drop=True))
+        return df.assign(**{f'{metric}_rolling_avg': moyennes[metric] for metric in metrics})
 
     def transform(self, df, config):
         """Agrégation principale des données"""
@@ -52,7 +59,9 @@ class DataAggregator(BaseTransformer):
                 df = self.calculate_rolling_averages(
                     df,
                     config['date_column'],
-                    config['metrics']
+                    config.get('rolling_metrics', config['metrics']),
+                    config.get('rolling_window', 7),
+                    config.get('country_column')
                 )
 
             self.logger.info("Agrégation des données terminée")
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from .base_transformer import BaseTransformer
 
@@ -14,12 +15,29 @@ class DataCleaner(BaseTransformer):
             'UK': 'United Kingdom',
             # Ajoutez d'autres mappings si nécessaire
         }
-        df[country_column] = df[country_column].replace(country_mapping)
+        pays = df[country_column]
+        if not isinstance(pays.dtype, pd.CategoricalDtype):
+            pays = pays.astype('category')
+
+        # Remappage des catégories : seules les quelques centaines de noms distincts sont traduites,
+        # les lignes ne portent que des codes entiers réindexés en une passe
+        anciennes = pays.cat.categories
+        traduites = pd.Index([country_mapping.get(nom, nom) for nom in anciennes])
+        if traduites.equals(anciennes):
+            df[country_column] = pays
+            return df
+        nouvelles = traduites.unique().sort_values()
+        correspondance = nouvelles.get_indexer(traduites)
+        codes = pays.cat.codes.to_numpy()
+        df[country_column] = pd.Categorical.from_codes(
+            np.where(codes >= 0, correspondance[codes], -1), categories=nouvelles
+        )
         return df
 
     def clean_dates(self, df, date_column):
         """Standardise les dates"""
-        df[date_column] = pd.to_datetime(df[date_column])
+        if not pd.api.types.is_datetime64_any_dtype(df[date_column]):
+            df[date_column] = pd.to_datetime(df[date_column])
         return df
 
     def transform(self, df, config):
@@ -35,9 +53,12 @@ class DataCleaner(BaseTransformer):
             if config.get('date_column'):
                 df = self.clean_dates(df, config['date_column'])
             
-            # Suppression des valeurs aberrantes
+            # Suppression des valeurs aberrantes : un seul masque pour toutes les colonnes, appliqué une fois
+            masque = np.ones(len(df), dtype=bool)
             for col in config.get('numeric_columns', []):
-                df = df[df[col] >= 0]  # Valeurs négatives non valides
+                masque &= (df[col] >= 0).to_numpy()  # Valeurs négatives (et manquantes) non valides
+            if not masque.all():
+                df = df[masque]
             
             self.logger.info("Nettoyage des données terminé")
             return df
@@ -0,0 +1,40 @@
+import pandas as pd
+from .base_transformer import BaseTransformer
+
+class IncrementalFilter(BaseTransformer):
+    def __init__(self):
+        super().__init__()
+
+    def filter_after_watermarks(self, df, country_column, date_column, watermarks, lookback_days):
+        """Garde les lignes postérieures à la dernière date chargée de chaque pays"""
+        if not watermarks:
+            return df
+
+        # Dernière date chargée alignée sur chaque ligne (NaT pour un pays jamais chargé)
+        seuils = pd.Series(watermarks, dtype='datetime64[ns]').reindex(df[country_column].to_numpy()).to_numpy()
+
+        # Quelques jours d'historique sont conservés pour que diff() et les moyennes mobiles restent exacts
+        debut = seuils - pd.Timedelta(days=lookback_days)
+        masque = pd.isna(seuils) | (df[date_column].to_numpy() > debut)
+        return df[masque]
+
+    def transform(self, df, config):
+        """Filtrage incrémental des données"""
+        try:
+            self.logger.info("Début du filtrage incrémental des données")
+            initial_size = len(df)
+
+            df = self.filter_after_watermarks(
+                df,
+                config['country_column'],
+                config['date_column'],
+                config.get('watermarks', {}),
+                config.get('lookback_days', 0)
+            )
+
+            self.logger.info(f"Filtrage incrémental terminé : {len(df)} lignes conservées sur {initial_size}")
+            return df
+
+        except Exception as e:
+            self.logger.error(f"Erreur lors du filtrage incrémental: {str(e)}")
+            raise
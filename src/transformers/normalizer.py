@@ -5,22 +5,42 @@ class DataNormalizer(BaseTransformer):
     def __init__(self):
         super().__init__()
 
-    def normalize_per_million(self, df, metric_column, population_column):
-        """Normalisation par million d'habitants"""
-        df[f'{metric_column}_per_million'] = (df[metric_column] / df[population_column]) * 1_000_000
-        return df
+    def load_population(self, file_path):
+        """Charge la table de référence des populations (nom_pays, population)"""
+        return pd.read_csv(file_path, dtype={'nom_pays': 'string', 'population': 'int64'})
+
+    def add_population(self, df, country_column, population, population_column='population'):
+        """Ajoute la population de chaque pays au DataFrame, en une seule jointure"""
+        population = population.rename(columns={'nom_pays': country_column, 'population': population_column})
+        # Clé de jointure commune : les colonnes pays catégorielles sont converties au même type
+        population[country_column] = population[country_column].astype(df[country_column].dtype)
+        population = population.dropna(subset=[country_column])
+        return df.merge(population, on=country_column, how='left', validate='many_to_one')
+
+    def normalize_per_million(self, df, metric_columns, population_column):
+        """Normalisation par million d'habitants de toutes les métriques, en une seule opération"""
+        if isinstance(metric_columns, str):
+            metric_columns = [metric_columns]
+        # Population inconnue : métriques par million à 0, comme avant l'ajout de la table de référence
+        par_million = (df[metric_columns].div(df[population_column], axis=0) * 1_000_000).fillna(0)
+        return df.assign(**{f'{metric}_per_million': par_million[metric] for metric in metric_columns})
 
     def transform(self, df, config):
         """Normalisation principale des données"""
         try:
             self.logger.info("Début de la normalisation des données")
             
+            # Population jointe par pays, si elle n'est pas déjà dans le DataFrame
+            population_column = config.get('population_column', 'population')
+            if population_column not in df.columns and config.get('population') is not None:
+                df = self.add_population(df, config['country_column'], config['population'], population_column)
+
             # Normalisation par million d'habitants
-            for metric in config.get('metrics_to_normalize', []):
+            if config.get('metrics_to_normalize'):
                 df = self.normalize_per_million(
                     df,
-                    metric,
-                    config['population_column']
+                    config['metrics_to_normalize'],
+                    population_column
                 )
             
             self.logger.info("Normalisation des données terminée")
@@ -0,0 +1,83 @@
+import hashlib
+import json
+import os
+import pandas as pd
+from src.config.config import DATA_PATHS, CACHE_CONFIG
+from src.utils.logger import setup_logger
+
+logger = setup_logger('cache')
+
+try:
+    import pyarrow  # noqa: F401 (moteur Parquet de pandas)
+    PARQUET_DISPONIBLE = True
+except ImportError:
+    PARQUET_DISPONIBLE = False
+
+
+class FrameCache:
+    """Cache Parquet des DataFrames transformés, adressé par le contenu du fichier source"""
+
+    def __init__(self, cache_dir=None, temp_dir=None, enabled=None):
+        self.cache_dir = cache_dir or DATA_PATHS['processed']
+        self.temp_dir = temp_dir or DATA_PATHS['temp']
+        self.enabled = CACHE_CONFIG['enabled'] if enabled is None else enabled
+        if self.enabled and not PARQUET_DISPONIBLE:
+            logger.warning("pyarrow n'est pas installé : cache des DataFrames désactivé")
+            self.enabled = False
+
+    def file_hash(self, file_path):
+        """Empreinte SHA-256 du contenu d'un fichier, lu par blocs"""
+        sha = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for bloc in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(bloc)
+        return sha.hexdigest()
+
+    def build_key(self, file_path, config):
+        """Clé du cache : contenu du fichier + configuration d'extraction/transformation + version"""
+        sha = hashlib.sha256()
+        sha.update(self.file_hash(file_path).encode())
+        sha.update(json.dumps(config, sort_keys=True, default=str).encode())
+        sha.update(CACHE_CONFIG['version'].encode())
+        return sha.hexdigest()[:16]
+
+    def _path(self, nom, key):
+        return os.path.join(self.cache_dir, f"{nom}_{key}.parquet")
+
+    def get(self, nom, key):
+        """Retourne le DataFrame en cache, ou None s'il est absent"""
+        if not self.enabled:
+            return None
+        path = self._path(nom, key)
+        if not os.path.exists(path):
+            logger.info(f"Cache absent pour {nom} ({key})")
+            return None
+        try:
+            df = pd.read_parquet(path, engine='pyarrow', memory_map=True)
+            logger.info(f"Cache utilisé pour {nom} ({key}) : {len(df)} lignes")
+            return df
+        except Exception as e:
+            logger.warning(f"Cache illisible pour {nom} ({key}), il sera reconstruit : {str(e)}")
+            return None
+
+    def put(self, nom, key, df):
+        """Enregistre un DataFrame dans le cache et supprime les anciennes versions"""
+        if not self.enabled:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            os.makedirs(self.temp_dir, exist_ok=True)
+
+            # Écriture dans data/temp puis renommage atomique : pas de fichier partiel en cache
+            temp_path = os.path.join(self.temp_dir, f"{nom}_{key}.parquet.tmp")
+            df.to_parquet(temp_path, engine='pyarrow', index=False)
+            path = self._path(nom, key)
+            os.replace(temp_path, path)
+
+            for fichier in os.listdir(self.cache_dir):
+                if fichier.startswith(f"{nom}_") and fichier.endswith('.parquet') and fichier != os.path.basename(path):
+                    os.remove(os.path.join(self.cache_dir, fichier))
+
+            logger.info(f"Cache enregistré pour {nom} ({key})")
+        except Exception as e:
+            logger.warning(f"Impossible d'enregistrer le cache pour {nom}: {str(e)}")
@@ -0,0 +1,17 @@
+import pandas as pd
+
+
+def content_hashes(df, colonnes_entieres, colonnes_decimales, date_column=None, decimales=6):
+    """Empreinte 64 bits (signée, pour une colonne BIGINT) du contenu de chaque ligne, en une passe vectorisée"""
+    # Types fixés avant le hachage : une même valeur lue en int32, float32 ou float64 donne la même empreinte
+    colonnes = {}
+    if date_column:
+        colonnes[date_column] = pd.to_datetime(df[date_column]).astype('datetime64[ns]')
+    for col in colonnes_entieres:
+        # Comme en base : valeurs manquantes à 0, entiers arrondis
+        colonnes[col] = df[col].astype('float64').fillna(0).round().astype('int64')
+    for col in colonnes_decimales:
+        # + 0.0 ramène -0.0 à 0.0, qui n'ont pas la même représentation binaire
+        colonnes[col] = df[col].astype('float64').fillna(0).round(decimales) + 0.0
+    empreintes = pd.util.hash_pandas_object(pd.DataFrame(colonnes, index=df.index), index=False)
+    return empreintes.to_numpy().view('int64')
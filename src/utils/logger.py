@@ -1,29 +1,154 @@
+import atexit
+import copy
+import json
 import logging
 import os
+import queue
+import threading
+import time
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from src.config.config import LOG_CONFIG
+
+FORMAT_TEXTE = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Configuration centrale : une file, un listener et ses handlers, partagés par tous les loggers
+_verrou = threading.Lock()
+_queue_handler = None
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Une ligne JSON par message"""
+
+    def format(self, record):
+        entree = {
+            'date': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'logger': record.name,
+            'niveau': record.levelname,
+            'message': record.getMessage(),
+            'processus': record.process,
+            'thread': record.threadName
+        }
+        if record.exc_text:
+            entree['exception'] = record.exc_text
+        return json.dumps(entree, ensure_ascii=False)
+
+
+class StructuredQueueHandler(QueueHandler):
+    """QueueHandler qui conserve la trace d'exception à part du message, pour le format JSON"""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+class RateLimitFilter(logging.Filter):
+    """Limite le nombre de messages DEBUG/INFO par emplacement d'appel et par intervalle, avec un résumé des messages écartés"""
+
+    def __init__(self, limite, intervalle):
+        super().__init__()
+        self.limite = limite
+        self.intervalle = intervalle
+        self._verrou = threading.Lock()
+        self._emplacements = {}  # (logger, fichier, ligne) -> [début de l'intervalle, émis, écartés]
+
+    def filter(self, record):
+        # Seuls DEBUG et INFO sont limités : avertissements et erreurs passent toujours
+        if self.limite <= 0 or record.levelno >= logging.WARNING:
+            return True
+        cle = (record.name, record.pathname, record.lineno)
+        maintenant = time.monotonic()
+        with self._verrou:
+            etat = self._emplacements.setdefault(cle, [maintenant, 0, 0])
+            if maintenant - etat[0] >= self.intervalle:
+                # Nouvel intervalle : le premier message résume ceux écartés pendant le précédent
+                if etat[2]:
+                    record.msg = f"{record.msg} ({etat[2]} messages similaires écartés)"
+                etat[:] = [maintenant, 0, 0]
+            if etat[1] < self.limite:
+                etat[1] += 1
+                return True
+            etat[2] += 1
+            return False
+
+    def pending_summaries(self):
+        """Retire et retourne les emplacements dont des messages ont été écartés"""
+        with self._verrou:
+            resumes = [(cle, etat[2]) for cle, etat in self._emplacements.items() if etat[2]]
+            for cle, _ in resumes:
+                self._emplacements[cle][2] = 0
+        return resumes
+
+
+def _build_handlers():
+    """Handlers fichier et console, exécutés dans le thread du QueueListener"""
+    formatter = JsonFormatter() if LOG_CONFIG['format'] == 'json' else logging.Formatter(FORMAT_TEXTE)
 
-def setup_logger(name):
     # Création du dossier logs s'il n'existe pas
-    if not os.path.exists('logs'):
-        os.makedirs('logs')
-    
-    # Configuration du logger
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-    
-    # Format du log
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    
-    # Handler pour fichier
-    file_handler = logging.FileHandler(f'logs/etl_{datetime.now().strftime("%Y%m%d")}.log')
+    os.makedirs(LOG_CONFIG['dir'], exist_ok=True)
+    file_handler = logging.FileHandler(
+        os.path.join(LOG_CONFIG['dir'], f'etl_{datetime.now().strftime("%Y%m%d")}.log'), encoding='utf-8'
+    )
     file_handler.setFormatter(formatter)
-    
-    # Handler pour console
+
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
-    
-    # Ajout des handlers
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
-    return logger
\ No newline at end of file
+    return [file_handler, console_handler]
+
+
+def configure_logging():
+    """Met en place, une seule fois par processus, la file de logs et son listener"""
+    global _queue_handler, _listener
+    with _verrou:
+        if _queue_handler is not None:
+            return _queue_handler
+
+        # Les modules n'écrivent que dans la file : fichiers et console sont servis par un thread dédié
+        file_attente = queue.SimpleQueue()
+        _listener = QueueListener(file_attente, *_build_handlers(), respect_handler_level=True)
+        _listener.start()
+
+        _queue_handler = StructuredQueueHandler(file_attente)
+        _queue_handler.addFilter(RateLimitFilter(LOG_CONFIG['rate_limit'], LOG_CONFIG['rate_interval']))
+        atexit.register(shutdown_logging)
+        return _queue_handler
+
+
+def shutdown_logging():
+    """Écrit les résumés en attente puis vide la file (appelé à la sortie du processus)"""
+    global _queue_handler, _listener
+    with _verrou:
+        if _queue_handler is None:
+            return
+        for filtre in _queue_handler.filters:
+            if isinstance(filtre, RateLimitFilter):
+                for (nom, fichier, ligne), ecartes in filtre.pending_summaries():
+                    # Mis directement dans la file : le résumé ne doit pas repasser par le filtre
+                    _queue_handler.enqueue(_queue_handler.prepare(logging.LogRecord(
+                        nom, logging.INFO, fichier, ligne,
+                        f"{ecartes} messages similaires écartés ({os.path.basename(fichier)}:{ligne})", None, None
+                    )))
+        _listener.stop()
+        _queue_handler = None
+        _listener = None
+
+
+def setup_logger(name):
+    """Retourne le logger d'un module, relié une seule fois à la file centrale"""
+    queue_handler = configure_logging()
+
+    # Configuration du logger
+    logger = logging.getLogger(name)
+    logger.setLevel(LOG_CONFIG['level'])
+    if queue_handler not in logger.handlers:
+        logger.addHandler(queue_handler)
+    logger.propagate = False
+
+    return logger
@@ -0,0 +1,207 @@
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from sqlalchemy import event
+from src.utils.logger import setup_logger
+
+logger = setup_logger('metrics')
+
+try:
+    import resource  # Absent sous Windows : la hausse du pic RSS n'est alors pas mesurée
+except ImportError:
+    resource = None
+
+# Métriques exportées au format Prometheus : (nom, clé de l'étape, aide)
+METRIQUES_PROMETHEUS = [
+    ('etl_stage_duration_seconds', 'secondes', "Durée d'exécution de l'étape"),
+    ('etl_stage_cpu_seconds', 'cpu_secondes', "Temps CPU consommé par l'étape"),
+    ('etl_stage_rows_in', 'lignes_entree', "Lignes reçues par l'étape"),
+    ('etl_stage_rows_out', 'lignes_sortie', "Lignes produites par l'étape"),
+    ('etl_stage_rss_start_bytes', 'rss_debut_octets', "Mémoire résidente du processus au début de l'étape"),
+    ('etl_stage_rss_end_bytes', 'rss_fin_octets', "Mémoire résidente du processus à la fin de l'étape"),
+    ('etl_stage_peak_rss_increase_bytes', 'hausse_pic_rss_octets',
+     "Hausse du pic de mémoire résidente du processus pendant l'étape (0 si le pic a été atteint avant)"),
+    ('etl_stage_db_statements', 'requetes', "Instructions SQL émises pendant l'étape"),
+    ('etl_stage_calls', 'appels', "Nombre d'exécutions de l'étape")
+]
+
+
+def peak_rss():
+    """Pic de mémoire résidente du processus, en octets (None si indisponible)"""
+    if resource is None:
+        return None
+    pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux : kilo-octets, macOS : octets
+    return pic if sys.platform == 'darwin' else pic * 1024
+
+
+def current_rss():
+    """Mémoire résidente actuelle du processus, en octets (None hors Linux)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def mo(octets):
+    """Taille lisible en mégaoctets pour les logs"""
+    return f"{octets / 2**20:.0f} Mo" if octets is not None else '-'
+
+
+class StageMesure:
+    """Mesure en cours d'une étape : les lignes sont renseignées par l'appelant"""
+
+    def __init__(self, lignes_entree=None):
+        self.lignes_entree = lignes_entree
+        self.lignes_sortie = None
+
+
+class RunMetrics:
+    """Métriques d'une exécution du pipeline, étape par étape"""
+
+    def __init__(self, run_id=None):
+        self._verrou = threading.Lock()
+        self._moteurs = set()
+        self.annexes = {}  # nom -> fonction, sections ajoutées au rapport
+        self.reset(run_id)
+
+    def reset(self, run_id=None):
+        """Repart d'une exécution vide ; les moteurs surveillés le restent"""
+        with self._verrou:
+            self.run_id = run_id or uuid.uuid4().hex[:12]
+            self.debut = datetime.now()
+            self.etapes = {}
+            self.requetes = 0
+
+    def watch_engine(self, engine):
+        """Compte les instructions SQL émises par un moteur, y compris depuis d'autres threads"""
+        if engine is None or id(engine) in self._moteurs:
+            return
+        self._moteurs.add(id(engine))
+        event.listen(engine, 'before_cursor_execute', lambda *args: self.record_statements())
+
+    def attach(self, nom, fournisseur):
+        """Ajoute au rapport une section calculée à chaque génération (état du pool de connexions...)"""
+        self.annexes[nom] = fournisseur
+
+    def record_statements(self, nombre=1):
+        """Ajoute des instructions SQL au compteur (COPY et curseurs bruts ne passent pas par les événements)"""
+        with self._verrou:
+            self.requetes += nombre
+
+    @contextmanager
+    def stage(self, nom, lignes_entree=None):
+        """Mesure une étape : durée, temps CPU, lignes, mémoire résidente et instructions SQL"""
+        mesure = StageMesure(lignes_entree)
+        requetes = self.requetes
+        # ru_maxrss est le pic depuis le démarrage du processus : seule sa hausse est imputable à l'étape
+        rss_debut, pic_debut = current_rss(), peak_rss()
+        debut, debut_cpu = time.perf_counter(), time.process_time()
+        statut = 'ok'
+        try:
+            yield mesure
+        except Exception:
+            statut = 'echec'
+            raise
+        finally:
+            self.add_stage(nom, {
+                'secondes': time.perf_counter() - debut,
+                'cpu_secondes': time.process_time() - debut_cpu,
+                'lignes_entree': mesure.lignes_entree,
+                'lignes_sortie': mesure.lignes_sortie,
+                'rss_debut_octets': rss_debut,
+                'rss_fin_octets': current_rss(),
+                'hausse_pic_rss_octets': peak_rss() - pic_debut if pic_debut is not None else None,
+                'requetes': self.requetes - requetes,
+                'statut': statut
+            })
+
+    def add_stage(self, nom, valeurs):
+        """Cumule une mesure dans son étape (une étape répétée, en streaming par exemple, est additionnée)"""
+        with self._verrou:
+            etape = self.etapes.setdefault(nom, {
+                'secondes': 0.0, 'cpu_secondes': 0.0, 'lignes_entree': None, 'lignes_sortie': None,
+                'rss_debut_octets': None, 'rss_fin_octets': None, 'hausse_pic_rss_octets': None,
+                'requetes': 0, 'appels': 0, 'statut': 'ok'
+            })
+            for cle in ('secondes', 'cpu_secondes', 'requetes'):
+                etape[cle] += valeurs.get(cle) or 0
+            for cle in ('lignes_entree', 'lignes_sortie'):
+                if valeurs.get(cle) is not None:
+                    etape[cle] = (etape[cle] or 0) + valeurs[cle]
+            # Étape répétée : mémoire au début du premier appel, à la fin du dernier, hausses du pic cumulées
+            if valeurs.get('rss_debut_octets') is not None and etape['rss_debut_octets'] is None:
+                etape['rss_debut_octets'] = valeurs['rss_debut_octets']
+            if valeurs.get('rss_fin_octets') is not None:
+                etape['rss_fin_octets'] = valeurs['rss_fin_octets']
+            if valeurs.get('hausse_pic_rss_octets') is not None:
+                etape['hausse_pic_rss_octets'] = (etape['hausse_pic_rss_octets'] or 0) + valeurs['hausse_pic_rss_octets']
+            etape['appels'] += valeurs.get('appels', 1)
+            if valeurs.get('statut', 'ok') != 'ok':
+                etape['statut'] = valeurs['statut']
+
+    def merge(self, etapes):
+        """Intègre les étapes mesurées dans un autre processus (mode parallèle)"""
+        for nom, valeurs in etapes.items():
+            self.add_stage(nom, valeurs)
+
+    def report(self):
+        """Rapport de l'exécution, sérialisable en JSON"""
+        with self._verrou:
+            etapes = {nom: dict(valeurs) for nom, valeurs in self.etapes.items()}
+        rapport = {
+            'run_id': self.run_id,
+            'debut': self.debut.isoformat(timespec='seconds'),
+            'fin': datetime.now().isoformat(timespec='seconds'),
+            'requetes': self.requetes,
+            'pic_rss_octets': peak_rss(),
+            'etapes': etapes
+        }
+        for nom, fournisseur in self.annexes.items():
+            rapport[nom] = fournisseur()
+        return rapport
+
+    def log_summary(self):
+        """Une ligne de log par étape, puis une par section annexe"""
+        rapport = self.report()
+        for nom, etape in rapport['etapes'].items():
+            lignes = f"{etape['lignes_entree'] if etape['lignes_entree'] is not None else '-'} -> " \
+                     f"{etape['lignes_sortie'] if etape['lignes_sortie'] is not None else '-'}"
+            rss = f"{mo(etape['rss_debut_octets'])} -> {mo(etape['rss_fin_octets'])}, " \
+                  f"hausse du pic {mo(etape['hausse_pic_rss_octets'])}"
+            logger.info(f"Étape {nom} : {etape['secondes']:.3f} s (CPU {etape['cpu_secondes']:.3f} s), "
+                        f"lignes {lignes}, RSS {rss}, {etape['requetes']} requêtes, {etape['appels']} appel(s)")
+        for nom in self.annexes:
+            logger.info(f"{nom} : {', '.join(f'{cle}={valeur}' for cle, valeur in rapport[nom].items())}")
+
+    def _write(self, path, contenu):
+        """Écriture atomique : un collecteur ne lit jamais un fichier à moitié écrit"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(contenu)
+        os.replace(tmp_path, path)
+
+    def write_json(self, path):
+        """Écrit le rapport de l'exécution en JSON"""
+        self._write(path, json.dumps(self.report(), ensure_ascii=False, indent=2))
+        logger.info(f"Rapport de métriques écrit dans {path}")
+
+    def write_prometheus(self, path):
+        """Écrit les métriques au format texte Prometheus (collecteur textfile de node_exporter)"""
+        etapes = self.report()['etapes']
+        lignes = []
+        for metrique, cle, aide in METRIQUES_PROMETHEUS:
+            lignes.append(f"# HELP {metrique} {aide}")
+            lignes.append(f"# TYPE {metrique} gauge")
+            for nom, etape in etapes.items():
+                if etape[cle] is not None:
+                    lignes.append(f'{metrique}{{stage="{nom}"}} {etape[cle]}')
+        self._write(path, "\n".join(lignes) + "\n")
+        logger.info(f"Métriques Prometheus écrites dans {path}")
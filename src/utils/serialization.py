@@ -0,0 +1,27 @@
+import pickle
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    ARROW_DISPONIBLE = True
+except ImportError:
+    ARROW_DISPONIBLE = False
+
+
+def serialize_frame(df):
+    """Sérialise un DataFrame pour l'échange entre processus (flux Arrow IPC, sinon pickle)"""
+    if ARROW_DISPONIBLE:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return b'arrow' + sink.getvalue().to_pybytes()
+    return b'pickl' + pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def deserialize_frame(data):
+    """Reconstruit un DataFrame sérialisé par serialize_frame"""
+    format_, contenu = data[:5], data[5:]
+    if format_ == b'arrow':
+        return pa.ipc.open_stream(contenu).read_all().to_pandas()
+    return pickle.loads(contenu)
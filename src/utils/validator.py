@@ -1,4 +1,6 @@
 from datetime import datetime
+import numpy as np
+import pandas as pd
 
 
 def validate_dataframe(df, required_columns):
@@ -14,4 +16,66 @@ def validate_date_format(date_str, format="%Y-%m-%d"):
         datetime.strptime(date_str, format)
         return True
     except ValueError:
-        return False
\ No newline at end of file
+        return False
+
+
+class ValidationReport:
+    """Rapport de validation : colonnes manquantes et lignes en erreur par colonne"""
+
+    def __init__(self, data=None, missing_columns=None):
+        # DataFrame dont les colonnes validées sont déjà converties
+        self.data = data
+        self.missing_columns = list(missing_columns or [])
+        self.invalid_rows = {}
+
+    def add(self, column, index):
+        """Enregistre les lignes en erreur d'une colonne"""
+        if len(index):
+            self.invalid_rows[column] = index
+
+    @property
+    def is_valid(self):
+        return not self.missing_columns and not self.invalid_rows
+
+    def __bool__(self):
+        return self.is_valid
+
+    def invalid_index(self):
+        """Index de toutes les lignes en erreur, toutes colonnes confondues"""
+        if not self.invalid_rows:
+            return pd.Index([])
+        return pd.Index(np.unique(np.concatenate([index.to_numpy() for index in self.invalid_rows.values()])))
+
+    def summary(self):
+        """Nombre de lignes en erreur par colonne"""
+        resume = {col: len(index) for col, index in self.invalid_rows.items()}
+        if self.missing_columns:
+            resume['colonnes_manquantes'] = self.missing_columns
+        return resume
+
+
+def validate_and_convert(df, required_columns, numeric_columns=(), date_column=None):
+    """Valide et convertit en une seule passe les colonnes numériques et de date d'un DataFrame"""
+    missing_columns = [col for col in required_columns if col not in df.columns]
+    if missing_columns:
+        return ValidationReport(df, missing_columns)
+
+    report = ValidationReport()
+    converted = {}
+    for col in numeric_columns:
+        serie = df[col]
+        if not pd.api.types.is_numeric_dtype(serie):
+            serie = pd.to_numeric(serie, errors='coerce')
+        converted[col] = serie
+        report.add(col, df.index[serie.isna().to_numpy()])
+
+    if date_column:
+        serie = df[date_column]
+        if not pd.api.types.is_datetime64_any_dtype(serie):
+            serie = pd.to_datetime(serie, format='ISO8601', errors='coerce')
+        converted[date_column] = serie
+        report.add(date_column, df.index[serie.isna().to_numpy()])
+
+    # Les valeurs converties sont conservées pour les étapes suivantes
+    report.data = df.assign(**converted) if converted else df
+    return report
@@ -0,0 +1,33 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from src.models.models import Base
+
+
+class SqliteManager:
+    """Remplace DatabaseManager par une base SQLite jetable (get_session seulement)"""
+
+    def __init__(self, path):
+        self.engine = create_engine(f"sqlite:///{path}")
+
+        # pysqlite gère lui-même les transactions : les savepoints imposent de lui retirer la main
+        @event.listens_for(self.engine, 'connect')
+        def desactiver_transactions_pysqlite(connexion_dbapi, _):
+            connexion_dbapi.isolation_level = None
+
+        @event.listens_for(self.engine, 'begin')
+        def commencer(connexion):
+            connexion.exec_driver_sql('BEGIN')
+
+        Base.metadata.create_all(self.engine)
+        self.session_maker = sessionmaker(bind=self.engine)
+
+    def get_session(self):
+        return self.session_maker()
+
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    db = SqliteManager(tmp_path / 'etl.db')
+    yield db
+    db.engine.dispose()
@@ -0,0 +1,105 @@
+from datetime import date
+import numpy as np
+import pandas as pd
+from src.loaders import PostgresLoader
+from src.utils.hashing import content_hashes
+
+
+def statistiques(**colonnes):
+    df = pd.DataFrame({
+        'date': ['2022-05-01', '2022-05-02'],
+        'cas_total': [10, 12],
+        'cas_par_million': [0.5, 0.25]
+    })
+    return df.assign(**colonnes)
+
+
+def empreintes(df):
+    return content_hashes(df, ['cas_total'], ['cas_par_million'], 'date')
+
+
+def test_empreinte_stable_selon_les_types():
+    reference = empreintes(statistiques())
+    variante = statistiques(
+        date=pd.to_datetime(['2022-05-01', '2022-05-02']),
+        cas_total=np.array([10.0, 12.0], dtype='float32'),
+        cas_par_million=np.array([0.5, 0.25], dtype='float32')
+    )
+
+    assert reference.dtype == np.int64
+    assert (empreintes(variante) == reference).all()
+
+
+def test_valeurs_manquantes_et_zero_negatif():
+    # Comme en base : une valeur manquante vaut 0, -0.0 et 0.0 sont identiques
+    manquantes = statistiques(cas_total=[np.nan, 12], cas_par_million=[np.nan, 0.25])
+    zeros = statistiques(cas_total=[0, 12], cas_par_million=[-0.0, 0.25])
+
+    assert (empreintes(manquantes) == empreintes(zeros)).all()
+
+
+def test_empreinte_change_avec_le_contenu():
+    reference = empreintes(statistiques())
+    modifiee = empreintes(statistiques(cas_total=[10, 13]))
+
+    assert modifiee[0] == reference[0]
+    assert modifiee[1] != reference[1]
+    # L'arrondi absorbe le bruit de calcul sous la 6e décimale
+    assert (empreintes(statistiques(cas_par_million=[0.5 + 1e-9, 0.25])) == reference).all()
+
+
+class FakeSession:
+    def __init__(self, lignes):
+        self.lignes = lignes
+        self.parametres = None
+
+    def execute(self, requete, parametres):
+        self.parametres = parametres
+        return iter(self.lignes)
+
+    def close(self):
+        pass
+
+
+class FakeDbManager:
+    """Renvoie les empreintes stockées fournies au lieu d'interroger la base"""
+
+    def __init__(self, lignes):
+        self.session = FakeSession(lignes)
+
+    def get_session(self):
+        return self.session
+
+
+def stat(jour, hash_contenu):
+    return {'date': pd.Timestamp(2022, 5, jour), 'cas_total': jour, 'hash_contenu': hash_contenu}
+
+
+def test_select_changed_ignore_les_lignes_inchangees():
+    db = FakeDbManager([(1, date(2022, 5, 1), 101), (1, date(2022, 5, 2), 102), (2, date(2022, 5, 1), 201)])
+    loader = PostgresLoader(db)
+    stats = {
+        1: [stat(1, 101), stat(2, 999), stat(3, 103)],   # inchangée, modifiée, nouvelle
+        2: [stat(1, 201)],                               # entièrement inchangée
+        3: [stat(1, None)]                               # sans empreinte : toujours écrite
+    }
+
+    modifiees = loader.select_changed(stats)
+
+    assert [s['date'].day for s in modifiees[1]] == [2, 3]
+    assert modifiees[2] == []
+    assert modifiees[3] == stats[3]
+    # Une seule requête, bornée à la plage de dates de chaque épidémie
+    assert db.session.parametres == {
+        'ids': [1, 2, 3],
+        'debuts': [date(2022, 5, 1)] * 3,
+        'fins': [date(2022, 5, 3), date(2022, 5, 1), date(2022, 5, 1)]
+    }
+
+
+def test_select_changed_sans_empreinte_stockee():
+    loader = PostgresLoader(FakeDbManager([]))
+    stats = {1: [stat(1, 101)]}
+
+    assert loader.select_changed(stats) is stats
+    assert loader.select_changed({}) == {}
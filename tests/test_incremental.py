@@ -0,0 +1,45 @@
+import pandas as pd
+from src.transformers import IncrementalFilter
+
+CONFIG = {'country_column': 'location', 'date_column': 'date'}
+
+
+def donnees():
+    return pd.DataFrame({
+        'location': ['France'] * 5 + ['Italy'] * 2,
+        'date': pd.to_datetime(['2022-05-01', '2022-05-02', '2022-05-03', '2022-05-04', '2022-05-05',
+                                '2022-05-01', '2022-05-02']),
+        'total_cases': range(7)
+    })
+
+
+def test_sans_watermark_tout_est_conserve():
+    df = donnees()
+
+    assert IncrementalFilter().transform(df, CONFIG) is df
+    assert IncrementalFilter().transform(df, {**CONFIG, 'watermarks': {}}) is df
+
+
+def test_lignes_posterieures_au_watermark():
+    resultat = IncrementalFilter().transform(donnees(), {**CONFIG, 'watermarks': {'France': '2022-05-03'}})
+
+    # France : après le 3 mai ; Italy, jamais chargée : toutes ses lignes
+    assert resultat['date'].dt.day.tolist() == [4, 5, 1, 2]
+    assert resultat['location'].tolist() == ['France', 'France', 'Italy', 'Italy']
+
+
+def test_historique_conserve_avant_le_watermark():
+    resultat = IncrementalFilter().transform(donnees(), {
+        **CONFIG, 'watermarks': {'France': pd.Timestamp('2022-05-03'), 'Italy': pd.Timestamp('2022-05-02')},
+        'lookback_days': 2
+    })
+
+    # Deux jours d'historique pour recalculer diff() et les moyennes mobiles
+    assert resultat[resultat['location'] == 'France']['date'].dt.day.tolist() == [2, 3, 4, 5]
+    assert resultat[resultat['location'] == 'Italy']['date'].dt.day.tolist() == [1, 2]
+
+
+def test_pays_deja_a_jour():
+    resultat = IncrementalFilter().transform(donnees(), {**CONFIG, 'watermarks': {'France': '2022-05-05', 'Italy': '2022-05-02'}})
+
+    assert resultat.empty
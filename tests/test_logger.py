@@ -0,0 +1,52 @@
+import importlib
+import logging
+from types import SimpleNamespace
+import pytest
+from src.utils.logger import RateLimitFilter
+
+
+def message(niveau=logging.INFO, ligne=10, texte="Lot chargé"):
+    return logging.LogRecord('loaders', niveau, 'postgres_loader.py', ligne, texte, None, None)
+
+
+@pytest.fixture
+def horloge(monkeypatch):
+    temps = [100.0]
+    module = importlib.import_module('src.utils.logger')
+    monkeypatch.setattr(module, 'time', SimpleNamespace(monotonic=lambda: temps[0]))
+    return temps
+
+
+def test_limite_par_emplacement(horloge):
+    filtre = RateLimitFilter(limite=2, intervalle=60)
+
+    assert [filtre.filter(message()) for _ in range(4)] == [True, True, False, False]
+    # Un autre emplacement d'appel a son propre compteur
+    assert filtre.filter(message(ligne=20))
+
+
+def test_avertissements_et_erreurs_jamais_limites(horloge):
+    filtre = RateLimitFilter(limite=1, intervalle=60)
+
+    assert filtre.filter(message(logging.DEBUG))
+    assert not filtre.filter(message(logging.DEBUG))
+    assert all(filtre.filter(message(niveau)) for niveau in (logging.WARNING, logging.ERROR, logging.CRITICAL) * 3)
+    assert filtre.pending_summaries() == [(('loaders', 'postgres_loader.py', 10), 1)]
+
+
+def test_resume_au_debut_de_l_intervalle_suivant(horloge):
+    filtre = RateLimitFilter(limite=1, intervalle=60)
+    for _ in range(3):
+        filtre.filter(message())
+
+    horloge[0] += 60
+    record = message()
+    assert filtre.filter(record)
+    assert record.msg == "Lot chargé (2 messages similaires écartés)"
+    assert filtre.pending_summaries() == []
+
+
+def test_sans_limite():
+    filtre = RateLimitFilter(limite=0, intervalle=60)
+
+    assert all(filtre.filter(message()) for _ in range(100))
@@ -0,0 +1,153 @@
+from datetime import date, datetime
+import pandas as pd
+from src.config.config import LOAD_CONFIG
+from src.loaders import PostgresLoader
+from src.models.models import ExecutionEtl, JournalChargement
+
+
+def executions(db):
+    session = db.get_session()
+    try:
+        return {run_id: statut for run_id, statut in session.query(ExecutionEtl.run_id, ExecutionEtl.statut)}
+    finally:
+        session.close()
+
+
+def journaliser(db, *executions_et_partitions):
+    session = db.get_session()
+    for run_id, statut, date_debut, partitions in executions_et_partitions:
+        session.add(ExecutionEtl(run_id=run_id, statut=statut, date_debut=date_debut))
+        session.flush()
+        session.add_all([JournalChargement(run_id=run_id, id_epidemie=id_epidemie, date_debut=debut,
+                                           date_fin=fin, nb_lignes=1)
+                         for id_epidemie, debut, fin in partitions])
+    session.commit()
+    session.close()
+
+
+def test_nouvelle_execution(sqlite_db):
+    loader = PostgresLoader(sqlite_db)
+    run_id = loader.start_run()
+
+    assert executions(sqlite_db) == {run_id: 'en_cours'}
+    assert loader.partitions_chargees == set()
+
+    loader.finish_run('succes')
+    assert executions(sqlite_db) == {run_id: 'succes'}
+    assert loader.run_id is None
+
+
+def test_reprise_de_la_derniere_execution_inachevee(sqlite_db):
+    journaliser(
+        sqlite_db,
+        ('ancienne', 'echec', datetime(2024, 1, 1), [(1, date(2020, 1, 1), date(2020, 1, 31))]),
+        ('partielle', 'partiel', datetime(2024, 1, 2), [(1, date(2020, 1, 1), date(2020, 3, 31)),
+                                                        (2, date(2020, 2, 1), date(2020, 2, 29))]),
+        ('reussie', 'succes', datetime(2024, 1, 3), [])
+    )
+    loader = PostgresLoader(sqlite_db)
+
+    assert loader.start_run(resume=True) == 'partielle'
+    assert executions(sqlite_db)['partielle'] == 'en_cours'
+    assert loader.partitions_chargees == {(1, date(2020, 1, 1), date(2020, 3, 31)),
+                                          (2, date(2020, 2, 1), date(2020, 2, 29))}
+    # Les agrégats des partitions validées avant l'interruption restent à recalculer
+    assert loader.plages_modifiees == {1: (date(2020, 1, 1), date(2020, 3, 31)),
+                                       2: (date(2020, 2, 1), date(2020, 2, 29))}
+    assert loader.lignes_rejetees == 0
+
+
+def test_reprise_sans_execution_inachevee(sqlite_db):
+    journaliser(sqlite_db, ('reussie', 'succes', datetime(2024, 1, 3), []))
+    loader = PostgresLoader(sqlite_db)
+
+    run_id = loader.start_run(resume=True)
+    assert run_id != 'reussie'
+    assert executions(sqlite_db) == {'reussie': 'succes', run_id: 'en_cours'}
+    assert loader.partitions_chargees == set()
+
+
+class EmpreintesStockees:
+    """Session renvoyant les empreintes déjà stockées à la place de la base"""
+
+    def __init__(self, lignes):
+        self.lignes = lignes
+        self.requetes = 0
+
+    def get_session(self):
+        return self
+
+    def execute(self, requete, parametres):
+        self.requetes += 1
+        return iter(self.lignes)
+
+    def close(self):
+        pass
+
+
+def test_reprise_apres_revision_partielle():
+    # Révision rétroactive : seule la dernière des trois lignes de la partition a changé
+    db = EmpreintesStockees([(1, date(2020, 5, d), 100 + d) for d in (1, 2, 3)])
+    loader = PostgresLoader(db)
+    loader.run_id = 'revision'
+    stats = [{'date': pd.Timestamp(2020, 5, d), 'hash_contenu': 100 + d} for d in (1, 2)]
+    stats.append({'date': pd.Timestamp(2020, 5, 3), 'hash_contenu': 999})
+    partitions = [('covid_France', 1, stats)]
+
+    selection = loader.select_partitions(partitions)
+    assert selection == [('covid_France', 1, stats[2:])]
+    # Le journal porte la plage de la partition entière, pas celle des lignes modifiées
+    assert loader.journal_rows({1: selection[0][2]}) == [('revision', 1, date(2020, 5, 1), date(2020, 5, 3), 1)]
+
+    # La reprise reconnaît la partition journalisée et ne la renvoie pas
+    loader.partitions_chargees = {(1, date(2020, 5, 1), date(2020, 5, 3))}
+    assert loader.select_partitions(partitions) == []
+    assert db.requetes == 1
+
+
+def test_groupes_de_points_de_reprise(sqlite_db, monkeypatch):
+    monkeypatch.setitem(LOAD_CONFIG, 'checkpoint_rows', 5)
+    stats = {id_epidemie: [{'date': pd.Timestamp(2020, 1, 1)}] * nb_lignes
+             for id_epidemie, nb_lignes in ((1, 3), (2, 3), (3, 6), (4, 1))}
+
+    groupes = list(PostgresLoader(sqlite_db).checkpoint_groups(stats))
+
+    # Une épidémie n'est jamais coupée : un groupe est clos dès qu'il atteint checkpoint_rows lignes
+    assert [list(groupe) for groupe in groupes] == [[1, 2], [3], [4]]
+    assert {id_epidemie: stats_list for groupe in groupes for id_epidemie, stats_list in groupe.items()} == stats
+
+
+def test_agregats_d_une_execution_en_echec_relancee_sans_reprise(sqlite_db):
+    # Exécution en échec après avoir validé deux partitions, sans recalcul de leurs agrégats
+    journaliser(
+        sqlite_db,
+        ('echouee', 'echec', datetime(2024, 1, 1), [(1, date(2020, 1, 1), date(2020, 3, 31)),
+                                                     (2, date(2020, 2, 1), date(2020, 2, 29))])
+    )
+    loader = PostgresLoader(sqlite_db)
+
+    # Relance sans --resume : ces lignes seront ignorées comme inchangées, leurs plages sont reprises du journal
+    run_id = loader.start_run()
+    assert loader.partitions_chargees == set()
+    assert loader.plages_modifiees == {1: (date(2020, 1, 1), date(2020, 3, 31)),
+                                       2: (date(2020, 2, 1), date(2020, 2, 29))}
+
+    # Une partition de l'exécution en cours, écrite sur une plage réduite aux lignes modifiées
+    loader.record_range(3, date(2020, 5, 1), date(2020, 5, 2))
+    session = sqlite_db.get_session()
+    session.add(JournalChargement(run_id=run_id, id_epidemie=3, date_debut=date(2020, 4, 1),
+                                  date_fin=date(2020, 5, 2), nb_lignes=2))
+    session.commit()
+    session.close()
+
+    a_marquer = loader.pending_rollups(loader.plages_modifiees)
+    assert len(a_marquer) == 3
+    # Une plage plus étroite que la partition journalisée d'une autre exécution ne la couvre pas
+    assert loader.pending_rollups({1: (date(2020, 2, 1), date(2020, 3, 31))}) == []
+
+    loader.mark_rollups_refreshed(a_marquer)
+    loader.finish_run('succes')
+
+    # Agrégats recalculés : les exécutions suivantes ne les reprennent plus
+    loader.start_run()
+    assert loader.plages_modifiees == {}
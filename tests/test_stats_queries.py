@@ -0,0 +1,124 @@
+import importlib
+from datetime import date
+from types import SimpleNamespace
+import pandas as pd
+import pytest
+from src.models.models import EpidemiePays, JournalChargement
+from src.queries import StatsQueries
+
+
+class FakeStatsQueries(StatsQueries):
+    """Résultats construits en mémoire : seul le journal de chargement est lu en base"""
+
+    def __init__(self, db_manager, **options):
+        super().__init__(db_manager, **options)
+        self.executions = 0
+
+    def _execute(self, requete, parametres):
+        self.executions += 1
+        if 'nom_pays' in parametres:
+            id_epidemie = {'France': 1, 'Italy': 2}[parametres['nom_pays']]
+            return pd.DataFrame({'id_epidemie': [id_epidemie], 'id_maladie': [1],
+                                 'date_observation': [pd.Timestamp('2020-06-01')], 'cas_total': [10]})
+        if 'nom_maladie' in parametres and 'n' not in parametres:
+            return pd.DataFrame({'id_epidemie': [1, 2], 'id_maladie': [1, 1],
+                                 'date_observation': [pd.Timestamp('2020-06-01')] * 2})
+        return pd.DataFrame({'id_epidemie': [1], 'valeur': [10]})
+
+
+@pytest.fixture
+def queries(sqlite_db):
+    return FakeStatsQueries(sqlite_db, cache_size=3, ttl=0, version_interval=3600)
+
+
+def test_cache_et_copies(queries):
+    serie = queries.get_series('France', 'COVID-19')
+    serie['cas_total'] = 0
+
+    # Deuxième lecture servie par le cache, sans être affectée par la modification de l'appelant
+    assert queries.get_series('France', 'COVID-19')['cas_total'].tolist() == [10]
+    assert queries.executions == 1
+    assert queries.cache_info()['hits'] == 1
+
+
+def test_eviction_lru(queries):
+    queries.get_series('France', 'COVID-19')
+    queries.get_series('Italy', 'COVID-19')
+    queries.get_latest('COVID-19')
+    queries.get_series('France', 'COVID-19')         # France redevient la plus récente
+    queries.top_n('cas_total', '2020-06-01')          # Italy, la moins récente, est évincée
+
+    assert queries.cache_info()['taille'] == 3
+    queries.get_series('France', 'COVID-19')
+    assert queries.executions == 4
+    queries.get_series('Italy', 'COVID-19')
+    assert queries.executions == 5
+
+
+def test_invalidation_ciblee(queries):
+    queries.get_series('France', 'COVID-19')
+    queries.get_series('Italy', 'COVID-19')
+    queries.top_n('cas_total', '2020-06-01')
+
+    # France rechargée du 1er au 3 mai : la série de l'Italie et le classement du 1er juin restent valides
+    queries.invalidate({1: (2, date(2020, 5, 1), date(2020, 5, 3))})
+    queries.get_series('Italy', 'COVID-19')
+    queries.top_n('cas_total', '2020-06-01')
+    assert queries.executions == 3
+    queries.get_series('France', 'COVID-19')
+    assert queries.executions == 4
+
+    # La maladie invalide la liste des dernières observations, la date le classement
+    queries.get_latest('COVID-19')
+    queries.invalidate({3: (1, date(2020, 6, 1), date(2020, 6, 1))})
+    assert [cle[0] for cle in queries._cache] == ['serie']
+    with pytest.raises(ValueError):
+        queries.top_n('inconnue', '2020-06-01')
+
+
+def test_resultat_obsolete_non_conserve(queries):
+    # Une validation pendant l'exécution de la requête : le résultat n'est pas mis en cache
+    execute = queries._execute
+
+    def execute_puis_invalide(requete, parametres):
+        queries.clear()
+        return execute(requete, parametres)
+
+    queries._execute = execute_puis_invalide
+    queries.get_series('France', 'COVID-19')
+    assert queries.cache_info()['taille'] == 0
+
+
+def test_expiration(sqlite_db, monkeypatch):
+    horloge = [1000.0]
+    # Le module est masqué par l'instance partagée du même nom dans src.queries
+    module = importlib.import_module('src.queries.stats_queries')
+    monkeypatch.setattr(module, 'time', SimpleNamespace(monotonic=lambda: horloge[0]))
+    queries = FakeStatsQueries(sqlite_db, cache_size=3, ttl=60, version_interval=3600)
+
+    queries.get_series('France', 'COVID-19')
+    horloge[0] += 30
+    queries.get_series('France', 'COVID-19')
+    horloge[0] += 31
+    queries.get_series('France', 'COVID-19')
+
+    assert queries.executions == 2
+    assert queries.cache_info()['expirations'] == 1
+
+
+def test_chargement_d_un_autre_processus(sqlite_db):
+    queries = FakeStatsQueries(sqlite_db, cache_size=3, ttl=0, version_interval=0)
+    queries.get_series('France', 'COVID-19')
+    queries.get_series('Italy', 'COVID-19')
+
+    # Partition de l'épidémie 1 journalisée par un autre processus
+    session = sqlite_db.get_session()
+    session.add(EpidemiePays(id_epidemie=1, id_pays=1, id_maladie=1, date_premier_cas=date(2020, 1, 1), statut='active'))
+    session.add(JournalChargement(run_id='autre', id_epidemie=1, date_debut=date(2020, 6, 1),
+                                  date_fin=date(2020, 6, 1), nb_lignes=1))
+    session.commit()
+    session.close()
+
+    queries.get_series('Italy', 'COVID-19')
+    queries.get_series('France', 'COVID-19')
+    assert queries.executions == 3
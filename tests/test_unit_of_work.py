@@ -0,0 +1,52 @@
+import pytest
+from src.loaders import UnitOfWork
+from src.models.models import Maladie
+
+
+def inserer(session, lot):
+    session.add_all([Maladie(nom_maladie=nom) for nom in lot])
+    session.flush()
+
+
+def maladies(db):
+    session = db.get_session()
+    try:
+        return sorted(nom for (nom,) in session.query(Maladie.nom_maladie))
+    finally:
+        session.close()
+
+
+def test_lot_rejete_annule_seul(sqlite_db):
+    with UnitOfWork(sqlite_db, commit_interval=10) as uow:
+        assert uow.execute_batch(inserer, ['COVID-19', 'MPOX'])
+        # Doublon : contrainte d'unicité violée, seul ce lot est annulé
+        assert not uow.execute_batch(inserer, ['Grippe', 'MPOX'])
+        assert uow.execute_batch(inserer, ['Ebola'])
+
+    assert maladies(sqlite_db) == ['COVID-19', 'Ebola', 'MPOX']
+    assert (uow.lots_valides, uow.lots_rejetes, uow.elements_rejetes) == (2, 1, 2)
+
+
+def test_validation_tous_les_commit_interval_lots(sqlite_db):
+    valides = []
+    with UnitOfWork(sqlite_db, commit_interval=2, on_commit=valides.append) as uow:
+        for lot in (['A'], ['B'], ['C']):
+            uow.execute_batch(inserer, lot)
+        # Deux lots validés, le troisième attend la sortie du bloc
+        assert valides == [['A', 'B']]
+        assert uow.lots_valides == 2
+
+    assert valides == [['A', 'B'], ['C']]
+    assert uow.lots_valides == 3
+
+
+def test_erreur_annule_les_lots_en_attente(sqlite_db):
+    with pytest.raises(RuntimeError):
+        with UnitOfWork(sqlite_db, commit_interval=2) as uow:
+            for lot in (['A'], ['B'], ['C']):
+                uow.execute_batch(inserer, lot)
+            raise RuntimeError("interruption")
+
+    # Les lots déjà validés sont conservés, le lot en attente est annulé
+    assert maladies(sqlite_db) == ['A', 'B']
+    assert uow.lots_valides == 2
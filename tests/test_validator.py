@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+from src.utils.validator import ValidationReport, validate_and_convert
+
+
+def test_colonnes_manquantes():
+    df = pd.DataFrame({'location': ['France']})
+    report = validate_and_convert(df, ['location', 'date', 'total_cases'])
+
+    assert not report
+    assert report.missing_columns == ['date', 'total_cases']
+    assert report.summary() == {'colonnes_manquantes': ['date', 'total_cases']}
+    # Le DataFrame est renvoyé tel quel
+    assert report.data is df
+
+
+def test_conversion_et_lignes_invalides():
+    df = pd.DataFrame({
+        'location': ['France', 'Italy', 'Spain'],
+        'date': ['2022-05-01', 'pas une date', '2022-05-03'],
+        'total_cases': ['10', '12', 'n/a']
+    })
+    report = validate_and_convert(df, ['location', 'date', 'total_cases'], ['total_cases'], 'date')
+
+    assert not report.is_valid
+    assert report.summary() == {'total_cases': 1, 'date': 1}
+    assert report.invalid_index().tolist() == [1, 2]
+    # Colonnes converties une seule fois, l'entrée n'est pas modifiée
+    assert pd.api.types.is_numeric_dtype(report.data['total_cases'])
+    assert pd.api.types.is_datetime64_any_dtype(report.data['date'])
+    assert df['total_cases'].tolist() == ['10', '12', 'n/a']
+
+
+def test_donnees_valides_deja_typees():
+    df = pd.DataFrame({
+        'date': pd.to_datetime(['2022-05-01', '2022-05-02']),
+        'total_cases': np.array([1.0, 2.0])
+    })
+    report = validate_and_convert(df, ['date', 'total_cases'], ['total_cases'], 'date')
+
+    assert report
+    assert report.summary() == {}
+    assert report.invalid_index().empty
+    pd.testing.assert_frame_equal(report.data, df)
+
+
+def test_rapport_index_sans_doublons():
+    report = ValidationReport()
+    report.add('a', pd.Index([3, 1]))
+    report.add('b', pd.Index([1, 2]))
+    report.add('c', pd.Index([]))
+
+    assert list(report.invalid_rows) == ['a', 'b']
+    assert report.invalid_index().tolist() == [1, 2, 3]